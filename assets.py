@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads loading assets in the background
+LOAD_WORKERS = 4
+
+
+class AssetManager:
+    """Loads the assets listed in a manifest on a thread pool.
+
+    The manifest maps asset names to {"file", "kind"} entries, plus
+    optionally "lazy": True for assets only loaded when first asked for.
+    loaders maps each kind to a function turning a path into the asset.
+    prefetch() starts every non-lazy asset loading and returns at once, so
+    the first frame doesn't wait for any of them.
+
+    Loaded assets are cached with a reference count: acquire() hands out
+    an asset (loading it if needed) and release() gives it back; an asset
+    nobody holds is dropped from the cache. Load times and failures are
+    kept per asset.
+    """
+
+    def __init__(self, manifest, loaders, workers=LOAD_WORKERS):
+        for name, entry in manifest.items():
+            if entry["kind"] not in loaders:
+                raise ValueError(f"No loader for {name!r} of kind {entry['kind']!r}")
+        self.manifest = manifest
+        self.loaders = loaders
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        self.futures = {}  # name -> Future of the asset
+        self.refs = {}  # name -> references handed out by acquire()
+        self.load_ms = {}  # name -> how long the last load took
+        self.errors = {}  # name -> exception of a failed load
+        self.reported = set()  # Names poll() has returned
+
+    def _load(self, name):
+        entry = self.manifest[name]
+        start = time.perf_counter()
+        try:
+            return self.loaders[entry["kind"]](entry["file"])
+        except Exception as e:
+            self.errors[name] = e
+            raise
+        finally:
+            self.load_ms[name] = (time.perf_counter() - start) * 1000
+
+    def request(self, name):
+        """Starts loading name unless it is cached or on its way; returns its Future."""
+        future = self.futures.get(name)
+        if future is None:
+            future = self.futures[name] = self.executor.submit(self._load, name)
+        return future
+
+    def prefetch(self):
+        """Starts loading every asset that isn't lazy."""
+        for name, entry in self.manifest.items():
+            if not entry.get("lazy"):
+                self.request(name)
+
+    def get(self, name):
+        """Returns the asset if it has loaded, without waiting; None otherwise."""
+        future = self.request(name)
+        if future.done() and future.exception() is None:
+            return future.result()
+        return None
+
+    def acquire(self, name):
+        """Returns the asset, waiting for it to load, and takes a reference.
+
+        Raises whatever the load raised.
+        """
+        asset = self.request(name).result()
+        self.refs[name] = self.refs.get(name, 0) + 1
+        return asset
+
+    def release(self, name):
+        """Gives back a reference; the asset is uncached once none are left."""
+        self.refs[name] -= 1
+        if self.refs[name] == 0:
+            del self.refs[name]
+            self.futures.pop(name, None)
+            self.reported.discard(name)
+
+    def poll(self):
+        """Returns the names whose loads finished since the last poll."""
+        done = [name for name, future in self.futures.items() if future.done()]
+        finished = [name for name in done if name not in self.reported]
+        self.reported.update(finished)
+        return finished
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def report(self):
+        """Returns report lines: load time or failure of each asset tried."""
+        lines = []
+        for name in self.manifest:
+            if name in self.errors:
+                lines.append(f"{name}: failed ({self.errors[name]})")
+            elif name in self.load_ms:
+                lines.append(f"{name}: {self.load_ms[name]:.1f} ms")
+        return lines
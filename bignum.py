@@ -0,0 +1,318 @@
+import math
+import sys
+import time
+
+# Magnitude below which every integer is exact in a float mantissa
+EXACT_LIMIT = 2**53
+
+# Exponent gap past which the smaller operand can't change a sum
+MAX_SHIFT = 64
+
+
+class BigNumber:
+    """A number stored as a float mantissa times 2 ** an int exponent.
+
+    The mantissa is kept in [0.5, 1) (negative for negative numbers, 0 for
+    zero), as math.frexp returns it, so every value takes the same two
+    slots and every operation costs the same however large it gets. Plain
+    floats overflow at about 1e308 and ints get slower with every digit.
+
+    Integers below EXACT_LIMIT are exact, so the economy behaves exactly as
+    it did with ints until it grows past that; beyond it values carry a
+    float's 53 bits of precision. BigNumbers are immutable and mix freely
+    with ints and floats in arithmetic and comparisons.
+    """
+
+    __slots__ = ("mantissa", "exponent")
+
+    def __init__(self, value=0):
+        if isinstance(value, BigNumber):
+            self.mantissa = value.mantissa
+            self.exponent = value.exponent
+        elif isinstance(value, (list, tuple)):
+            # The [mantissa, exponent] pair written by to_json
+            self.mantissa, self.exponent = _normalize(float(value[0]), int(value[1]))
+        elif isinstance(value, int) and abs(value).bit_length() > 1000:
+            # float() would overflow; round the top 64 bits to a float instead
+            shift = abs(value).bit_length() - 64
+            top = abs(value) >> shift
+            mantissa, exponent = math.frexp(float(top if value > 0 else -top))
+            self.mantissa = mantissa
+            self.exponent = exponent + shift
+        else:
+            self.mantissa, self.exponent = math.frexp(value)
+
+    @classmethod
+    def _make(cls, mantissa, exponent):
+        number = object.__new__(cls)
+        number.mantissa, number.exponent = _normalize(mantissa, exponent)
+        return number
+
+    # Arithmetic
+
+    def __add__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b = (self, other) if self.exponent >= other.exponent else (other, self)
+        if not b.mantissa:
+            return a
+        if not a.mantissa:
+            return b
+        shift = b.exponent - a.exponent
+        if shift < -MAX_SHIFT:
+            return a
+        return BigNumber._make(a.mantissa + math.ldexp(b.mantissa, shift), a.exponent)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return other + (-self)
+
+    def __mul__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return BigNumber._make(self.mantissa * other.mantissa, self.exponent + other.exponent)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        if not other.mantissa:
+            raise ZeroDivisionError("BigNumber division by zero")
+        return BigNumber._make(self.mantissa / other.mantissa, self.exponent - other.exponent)
+
+    def __rtruediv__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return other / self
+
+    def __floordiv__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return self._divmod(other)[0]
+
+    def __rfloordiv__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return other._divmod(self)[0]
+
+    def __mod__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return self._divmod(other)[1]
+
+    def __divmod__(self, other):
+        other = _coerce(other)
+        if other is None:
+            return NotImplemented
+        return self._divmod(other)
+
+    def _divmod(self, other):
+        """Returns (self // other, self % other) for a BigNumber other.
+
+        Exact while both fit in a float. Past that, self is so large that
+        every representable quotient is a whole number and the remainder
+        can't be told from zero.
+        """
+        if self.exponent <= 1023 and other.exponent <= 1023:
+            quotient, remainder = divmod(float(self), float(other))
+            return _from_float(quotient), _from_float(remainder)
+        quotient = self / other
+        if quotient.exponent <= 53:
+            quotient = BigNumber(math.floor(float(quotient)))
+            return quotient, self - other * quotient
+        return quotient, BigNumber()
+
+    def __neg__(self):
+        number = object.__new__(BigNumber)
+        number.mantissa = -self.mantissa
+        number.exponent = self.exponent
+        return number
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if self.mantissa < 0 else self
+
+    # Comparisons
+
+    def _compare(self, other):
+        """Returns a negative, zero or positive number like self - other."""
+        other = _coerce(other)
+        if other is None:
+            return None
+        if (self.mantissa > 0) != (other.mantissa > 0) or not (
+            self.mantissa and other.mantissa
+        ):
+            return self.mantissa - other.mantissa
+        if self.exponent != other.exponent:
+            larger = self.exponent > other.exponent
+            return 1 if larger == (self.mantissa > 0) else -1
+        return self.mantissa - other.mantissa
+
+    def __eq__(self, other):
+        difference = self._compare(other)
+        return NotImplemented if difference is None else difference == 0
+
+    def __ne__(self, other):
+        difference = self._compare(other)
+        return NotImplemented if difference is None else difference != 0
+
+    def __lt__(self, other):
+        difference = self._compare(other)
+        return NotImplemented if difference is None else difference < 0
+
+    def __le__(self, other):
+        difference = self._compare(other)
+        return NotImplemented if difference is None else difference <= 0
+
+    def __gt__(self, other):
+        difference = self._compare(other)
+        return NotImplemented if difference is None else difference > 0
+
+    def __ge__(self, other):
+        difference = self._compare(other)
+        return NotImplemented if difference is None else difference >= 0
+
+    def __hash__(self):
+        # Equal ints and floats must hash alike, so hash as one when we fit
+        if self.exponent <= 1023:
+            return hash(float(self))
+        return hash((self.mantissa, self.exponent))
+
+    # Conversions
+
+    def __bool__(self):
+        return self.mantissa != 0
+
+    def __float__(self):
+        try:
+            return math.ldexp(self.mantissa, self.exponent)
+        except OverflowError:
+            return math.copysign(math.inf, self.mantissa)
+
+    def __int__(self):
+        if self.exponent <= 53:
+            return int(math.ldexp(self.mantissa, self.exponent))
+        return int(math.ldexp(self.mantissa, 53)) << (self.exponent - 53)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (BigNumber, ((self.mantissa, self.exponent),))
+
+    def is_exact(self):
+        """Returns whether this is a whole number small enough to be exact."""
+        return self.exponent <= 53 and float(self).is_integer()
+
+    def log10(self):
+        if self.mantissa <= 0:
+            raise ValueError("log10 of a non-positive BigNumber")
+        return math.log10(self.mantissa) + self.exponent * math.log10(2)
+
+    def to_json(self):
+        """Returns an int if that's exact, otherwise a [mantissa, exponent] pair."""
+        if self.is_exact():
+            return int(self)
+        return [self.mantissa, self.exponent]
+
+    def __str__(self):
+        if self.is_exact() and abs(self) < 10**15:
+            return str(int(self))
+        if self.exponent <= 1023:
+            return f"{float(self):.6g}"
+        digits = self.log10() if self.mantissa > 0 else (-self).log10()
+        exponent10 = math.floor(digits)
+        mantissa10 = math.copysign(10 ** (digits - exponent10), self.mantissa)
+        return f"{mantissa10:.5f}e{exponent10}"
+
+    def __repr__(self):
+        return f"BigNumber({self})"
+
+
+def _normalize(mantissa, exponent):
+    if not mantissa:
+        return 0.0, 0
+    mantissa, shift = math.frexp(mantissa)
+    return mantissa, exponent + shift
+
+
+def _from_float(value, new=object.__new__, frexp=math.frexp):
+    number = new(BigNumber)
+    number.mantissa, number.exponent = frexp(value)
+    return number
+
+
+def _coerce(value):
+    """Returns value as a BigNumber, or None if it isn't a number we know."""
+    kind = type(value)
+    if kind is BigNumber:
+        return value
+    if kind is float or (kind is int and -EXACT_LIMIT < value < EXACT_LIMIT):
+        return _from_float(value)  # The common case, kept fast
+    if isinstance(value, (int, float)):
+        return BigNumber(value)
+    return None
+
+
+def to_json(value):
+    """JSON-friendly form of a number that may be a BigNumber."""
+    return value.to_json() if isinstance(value, BigNumber) else value
+
+
+def from_json(value):
+    """Undoes to_json: [mantissa, exponent] pairs become BigNumbers again."""
+    return BigNumber(value) if isinstance(value, (list, tuple)) else value
+
+
+def benchmark(iterations=100000):
+    """Times BigNumber and int arithmetic at growing magnitudes.
+
+    Returns (magnitude, BigNumber ns per op, int ns per op) rows. The
+    BigNumber column should stay flat where the int column keeps growing.
+    """
+    rows = []
+    for digits in (3, 30, 300, 3000, 30000, 300000):
+        value = 10**digits + 7
+        operands = [(BigNumber(value), BigNumber(value // 3)), (value, value // 3)]
+        timings = []
+        for a, b in operands:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                c = a + b
+                c = c - b
+                c = c * 3
+                c >= a
+            timings.append((time.perf_counter() - start) * 1e9 / (iterations * 4))
+        rows.append((f"1e{digits}", timings[0], timings[1]))
+    return rows
+
+
+if __name__ == "__main__":
+    # Usage: python bignum.py [iterations]  -> prints the benchmark table
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'magnitude':>10} {'BigNumber':>12} {'int':>12}")
+    for magnitude, big_ns, int_ns in benchmark(iterations):
+        print(f"{magnitude:>10} {big_ns:>10.0f}ns {int_ns:>10.0f}ns")
@@ -1,19 +1,26 @@
 import pygame
 import sys
-import json
 import os
+import io
+import time
+from collections import OrderedDict
+from functools import partial
 from pygame.locals import *
 
-# Initialize Pygame
-pygame.init()
+import assets
+import fontcache
+import frameprofiler
+import gamecore
+import numformat
+import savestore
+import soundpool
+from gamecore import SHOP_ITEMS
 
-# Initialize Pygame mixer for sounds
-pygame.mixer.init()
+# The game logic lives in gamecore; this module is the pygame front end.
+# Nothing runs on import: main() sets up pygame and runs the game loop.
 
-# Set up display
+# Display size
 WIDTH, HEIGHT = 800, 600  # Increased width for better UI
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Clicky!")
 
 # Define colors
 WHITE = (255, 255, 255)
@@ -25,40 +32,72 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 LIGHT_GRAY = (220, 220, 220)
 
-# Set up fonts
-FONT = pygame.font.SysFont("arial", 24)
-BIG_FONT = pygame.font.SysFont("arial", 32)
-
-# Game variables
-coins = 0
-cps = 0  # Coins per second
-last_update_time = pygame.time.get_ticks()
-
-# Upgrade costs and effects
-upgrade_cost = 10
-upgrade_amount = 1
-
-# New Mega Upgrade Variables
-mega_upgrade_cost = 200
-mega_upgrade_amount = 10  # CPS increase
-
-# Shop items
-SHOP_ITEMS = {
-    "CPS Booster": {
-        "name": "CPS Booster",
-        "cost": 100,
-        "effect": {"cps_increase": 10, "duration": 10},  # seconds
-    }
+# Rendering mode: "dirty" pushes only changed regions, "full" flips every frame
+RENDER_MODE = os.environ.get("CLICKY_RENDER_MODE", "dirty")
+
+# Frame pacing: full speed right after input, the simulation's 10 Hz when
+# idle or unfocused (so counters still update every tick), and no rendering
+# at all while the window is hidden or minimized
+ACTIVE_FPS = 60
+IDLE_FPS = 10
+HIDDEN_FPS = 2  # Loop rate while hidden: events and simulation only
+ACTIVE_MS = 1000  # How long input keeps the loop at ACTIVE_FPS
+
+# Side of the square cells the hit-test grid splits the window into
+HIT_CELL_SIZE = 50
+
+# The only events the game reads; everything else (mouse motion, button
+# releases, text input...) is blocked before it reaches the queue
+ALLOWED_EVENTS = [
+    pygame.QUIT,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.KEYDOWN,
+    pygame.VIDEOEXPOSE,
+    pygame.WINDOWEXPOSED,
+    pygame.WINDOWSHOWN,
+    pygame.WINDOWHIDDEN,
+    pygame.WINDOWMINIMIZED,
+    pygame.WINDOWRESTORED,
+    pygame.WINDOWFOCUSGAINED,
+    pygame.WINDOWFOCUSLOST,
+]
+
+# Asset manifest: everything is loaded in the background from startup,
+# so the first frame never waits for it
+ASSETS = {
+    "click": {"file": "click.wav", "kind": "sound"},  # Collecting coins
+    "purchase": {"file": "purchase.wav", "kind": "sound"},  # Purchasing/upgrading
+    "use_item": {"file": "use_item.wav", "kind": "sound"},  # Using an item
+    "background": {"file": "background.mp3", "kind": "music"},
 }
 
-# Player inventory
-inventory = {"CPS Booster": 0}
-
-# Active effects
-active_effects = []
-
-# Save file path
-SAVE_FILE = "savegame.json"
+# Sound effects: asset name -> (category, max voices, min ms between starts)
+SOUNDS = {
+    "click": ("click", 2, 40),
+    "purchase": ("action", 2, 60),
+    "use_item": ("action", 1, 100),
+}
+# Mixer channels reserved for each sound category
+SOUND_CHANNELS = {"click": 2, "action": 2}
+
+# How coins, CPS and costs are written: "short" (1.23M) or "engineering" (1.23e6)
+NUMBER_STYLE = os.environ.get("CLICKY_NUMBER_STYLE", numformat.SHORT)
+
+# Frame profiler: F3 toggles the overlay, F4 writes the recorded frame
+# times to PROFILE_FILE. CLICKY_PROFILE starts with the overlay shown.
+PROFILE = bool(os.environ.get("CLICKY_PROFILE"))
+PROFILE_FILE = "frametimes.csv"
+PROFILE_REFRESH_MS = 250  # How often the overlay's numbers are refreshed
+PROFILE_SPARK_FRAMES = 120  # Frames shown in the overlay's sparkline
+FRAME_BUDGET_MS = 1000 / ACTIVE_FPS
+
+# Save storage: a single file by default, or a slot in a SQLite database
+# when CLICKY_SAVE_SLOT names a profile. The JSON file is only read to
+# migrate older saves.
+SAVE_FILE = "savegame.dat"
+LEGACY_SAVE_FILE = "savegame.json"
+SAVE_DATABASE = "saves.db"
+SAVE_SLOT = os.environ.get("CLICKY_SAVE_SLOT")
 
 # Game states
 MAIN_GAME = "main"
@@ -67,98 +106,589 @@ INVENTORY_SCREEN = "inventory"
 
 current_screen = MAIN_GAME
 
-# Sound Effects and Music
-try:
-    click_sound = pygame.mixer.Sound("click.wav")  # Sound when collecting coins
-    purchase_sound = pygame.mixer.Sound(
-        "purchase.wav"
-    )  # Sound when purchasing/upgrading
-    use_item_sound = pygame.mixer.Sound("use_item.wav")  # Sound when using an item
-    pygame.mixer.music.load("background.mp3")  # Background music
-    pygame.mixer.music.set_volume(0.5)  # Set volume (0.0 to 1.0)
-    pygame.mixer.music.play(-1)  # Play background music indefinitely
-except pygame.error as e:
-    print(f"Error loading sound files: {e}")
-    print(
-        "Ensure that 'click.wav', 'purchase.wav', 'use_item.wav', and 'background.mp3' are in the same directory as the script."
-    )
-    # You can choose to continue without sounds or exit
-    # sys.exit()
+# Selected bulk purchase quantity, an index into gamecore.BULK_QUANTITIES
+buy_quantity_index = 0
+
+# Set up by main()
+WIN = None
+FONT = None
+BIG_FONT = None
+SMALL_FONT = None
+game = None
+asset_manager = None
+sound_pool = None
+
+# Initialize message variables
+message = ""
+message_time = 0  # Time when the message should disappear
+
+
+def load_music(path):
+    """Reads a music file into memory, for the mixer to stream from."""
+    with open(path, "rb") as f:
+        return io.BytesIO(f.read())
+
+
+def start_loading_assets():
+    """Starts loading sounds and music in the background."""
+    global asset_manager, sound_pool
+    sound_pool = soundpool.SoundPool(SOUND_CHANNELS)
+    loaders = {"sound": pygame.mixer.Sound, "music": load_music}
+    asset_manager = assets.AssetManager(ASSETS, loaders)
+    asset_manager.prefetch()
+
+
+def use_loaded_assets():
+    """Puts assets that finished loading since the last frame to use."""
+    for name in asset_manager.poll():
+        entry = ASSETS[name]
+        if name in asset_manager.errors:
+            print(f"Error loading {entry['file']}: {asset_manager.errors[name]}")
+            print("Ensure it is in the same directory as the script.")
+        elif entry["kind"] == "sound":
+            sound_pool.add(name, asset_manager.acquire(name), *SOUNDS[name])
+        elif entry["kind"] == "music":
+            hint = os.path.splitext(entry["file"])[1].lstrip(".")
+            try:
+                pygame.mixer.music.load(asset_manager.acquire(name), hint)
+                pygame.mixer.music.set_volume(0.5)  # Set volume (0.0 to 1.0)
+                pygame.mixer.music.play(-1)  # Play background music indefinitely
+            except pygame.error as e:
+                print(f"Error playing {entry['file']}: {e}")
+
+
+def play_sound(name):
+    """Plays a sound effect through the pool, which drops it if it's saturated."""
+    if sound_pool is not None:
+        sound_pool.play(name)
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, font, color, antialias)."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font, color, antialias=True):
+        """Returns a rendered surface for the text, rasterizing only on a miss."""
+        key = (text, font, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Evict least recently used
+        return surface
+
+    def clear(self):
+        """Drops every cached surface and resets the counters."""
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Cache for rendered labels, most of which never change between frames
+TEXT_CACHE = TextCache()
+
+
+# Characters a formatted number can contain: digits, punctuation and the
+# numformat suffixes
+GLYPHS = "0123456789.,-+e " + "".join(numformat.SUFFIXES)
+
+
+class GlyphAtlas:
+    """Pre-rendered glyphs of one font and color, for composing numbers.
+
+    Every character of GLYPHS is rasterized once up front. glyph() renders
+    anything else (like a label prefix) on first use and keeps it too.
+    """
+
+    def __init__(self, font, color, characters=GLYPHS):
+        self.font = font
+        self.color = color
+        self.height = font.get_height()
+        self.glyphs = {}
+        for char in set(characters):
+            self.glyph(char)
+
+    def glyph(self, text):
+        surface = self.glyphs.get(text)
+        if surface is None:
+            surface = self.glyphs[text] = self.font.render(text, True, self.color)
+        return surface
+
+
+# GlyphAtlas per (font, color); a pygame Font is one face at one size
+GLYPH_ATLASES = {}
+
+
+def glyph_atlas(font, color):
+    atlas = GLYPH_ATLASES.get((font, color))
+    if atlas is None:
+        atlas = GLYPH_ATLASES[(font, color)] = GlyphAtlas(font, color)
+    return atlas
+
+
+class GlyphCounter:
+    """A centered "prefix + number" line drawn from a GlyphAtlas.
+
+    The line is laid out as cells, one per character after the prefix,
+    each the width of its glyph. When the text changes only the cells that
+    differ from the last draw are erased and blitted again, so a counter
+    ticking from 1234 to 1235 repaints one digit.
+    """
+
+    def __init__(self, atlas, prefix, x, y):
+        self.atlas = atlas
+        self.prefix = prefix
+        self.x = x
+        self.y = y
+        self.cells = []  # (text, rect) of the prefix and each character drawn
+        self.glyphs_blitted = 0
+
+    def layout(self, text):
+        parts = [self.prefix] + list(text)
+        widths = [self.atlas.glyph(part).get_width() for part in parts]
+        left = self.x - sum(widths) // 2
+        top = self.y - self.atlas.height // 2
+        cells = []
+        for part, width in zip(parts, widths):
+            cells.append((part, pygame.Rect(left, top, width, self.atlas.height)))
+            left += width
+        return cells
+
+    def draw(self, surface, erase, text, redraw=False):
+        """Draws the counter showing text; returns the rects it touched.
+
+        erase(rect) restores the background under a cell. With redraw,
+        every cell is drawn without erasing anything first, as after the
+        whole surface was cleared.
+        """
+        cells = self.layout(text)
+        old_cells = [] if redraw else self.cells
+        dirty = []
+        # Erase old cells first: changed new cells may overlap old neighbours
+        for i, cell in enumerate(old_cells):
+            if i >= len(cells) or cells[i] != cell:
+                erase(cell[1])
+                dirty.append(cell[1])
+        for i, cell in enumerate(cells):
+            if i < len(old_cells) and old_cells[i] == cell:
+                continue
+            surface.blit(self.atlas.glyph(cell[0]), cell[1])
+            dirty.append(cell[1])
+            self.glyphs_blitted += 1
+        self.cells = cells
+        return dirty
+
+    @property
+    def rect(self):
+        return self.cells[0][1].unionall([rect for _, rect in self.cells])
 
 
 def draw_text(text, font, color, surface, x, y, center=True):
     """Utility function to draw text on the screen."""
-    textobj = font.render(text, True, color)
+    textobj = TEXT_CACHE.render(text, font, color)
     if center:
         textrect = textobj.get_rect(center=(x, y))
     else:
         textrect = textobj.get_rect(topleft=(x, y))
     surface.blit(textobj, textrect)
+    return textrect
 
 
-def draw_button(rect, color, text, surface=WIN):
+def draw_button(rect, color, text, surface=None):
     """Utility function to draw a button with text."""
+    if surface is None:
+        surface = WIN
     pygame.draw.rect(surface, color, rect)
+    drawn = rect.copy()
     # Handle multi-line text
     lines = text.split("\n")
     for i, line in enumerate(lines):
-        draw_text(line, FONT, BLACK, surface, rect.centerx, rect.centery - 10 + i * 25)
+        drawn.union_ip(
+            draw_text(
+                line, FONT, BLACK, surface, rect.centerx, rect.centery - 10 + i * 25
+            )
+        )
+    return drawn
+
+
+def draw_card(rect, lines, surface=None):
+    """Draws a shop/inventory card: a gray box with (text, y offset) lines."""
+    if surface is None:
+        surface = WIN
+    pygame.draw.rect(surface, LIGHT_GRAY, rect)
+    drawn = rect.copy()
+    for text, offset in lines:
+        drawn.union_ip(
+            draw_text(text, FONT, BLACK, surface, rect.centerx, rect.y + offset)
+        )
+    return drawn
+
+
+def draw_title(text, surface=None):
+    """Draws a screen's title at the top."""
+    if surface is None:
+        surface = WIN
+    return draw_text(text, BIG_FONT, BLACK, surface, WIDTH // 2, 50)
+
+
+def draw_message(text):
+    """Draws the temporary status message at the bottom of the screen."""
+    if text:
+        return draw_text(text, FONT, RED, WIN, WIDTH // 2, HEIGHT - 30)
+    return None
+
+
+def draw_profiler_overlay(lines, spark, surface=None):
+    """Draws the frame profiler's panel in the top left corner.
+
+    lines are rows of cells: the first is left-aligned, the rest are
+    right-aligned in columns. spark is a sparkline of recent frame times in
+    ms, drawn against a line at the frame budget. Draws nothing for None.
+    """
+    if lines is None:
+        return None
+    if surface is None:
+        surface = WIN
+    line_height = SMALL_FONT.get_linesize()
+    spark_height = 40
+    panel = pygame.Surface(
+        (260, 8 + len(lines) * line_height + spark_height + 8), pygame.SRCALPHA
+    )
+    panel.fill((0, 0, 0, 180))
+    for i, cells in enumerate(lines):
+        y = 4 + i * line_height
+        panel.blit(TEXT_CACHE.render(cells[0], SMALL_FONT, WHITE), (6, y))
+        for column, cell in enumerate(cells[1:]):
+            text = TEXT_CACHE.render(cell, SMALL_FONT, WHITE)
+            panel.blit(text, text.get_rect(topright=(150 + column * 50, y)))
+    # Sparkline, scaled so the frame budget sits at half height
+    top = 8 + len(lines) * line_height
+    scale = spark_height / max(2 * FRAME_BUDGET_MS, max(spark, default=0))
+    budget_y = top + spark_height - int(FRAME_BUDGET_MS * scale)
+    pygame.draw.line(panel, YELLOW, (6, budget_y), (panel.get_width() - 6, budget_y))
+    if len(spark) > 1:
+        step = (panel.get_width() - 12) / (PROFILE_SPARK_FRAMES - 1)
+        points = [
+            (6 + i * step, top + spark_height - ms * scale) for i, ms in enumerate(spark)
+        ]
+        pygame.draw.lines(panel, GREEN, False, points)
+    return surface.blit(panel, (10, 10))
+
+
+def profiler_lines(profiler, scheduler):
+    """Text rows for the profiler overlay: rates, then p50/p95/p99 per phase."""
+    lines = [
+        (f"{scheduler.render_rate:.0f} fps, {scheduler.sim_rate:.0f} sim steps/s",),
+        (f"{INPUT.events_processed} events this frame, {INPUT.clicks_folded} clicks batched",),
+        ("ms", "p50", "p95", "p99"),
+    ]
+    for phase in [None] + profiler.phase_names:
+        result = profiler.percentiles(phase)
+        if result is not None:
+            lines.append((phase or "frame",) + tuple(f"{ms:.2f}" for ms in result))
+    return tuple(lines)
+
+
+class StaticLayer:
+    """Off-screen surface with one screen's static widgets baked in.
+
+    A widget is drawn into the layer through draw(key, draw_fn, *args) and
+    only drawn again when its args change. The area it covered is then
+    repainted, along with any neighbours overlapping it, in their original
+    order, so a longer cost label never leaves bits of the old one behind.
+    draw_fn must take the target as a surface keyword.
+    """
+
+    def __init__(self, size, background):
+        self.surface = pygame.Surface(size)
+        self.surface.fill(background)
+        self.background = background
+        self.widgets = {}  # key -> [draw_fn, args, drawn rect], in drawing order
+        self.rebuilds = 0
+
+    def draw(self, key, draw_fn, *args):
+        """Bakes a widget into the layer; returns the rects that changed."""
+        widget = self.widgets.get(key)
+        if widget is not None and widget[1] == args:
+            return []
+        self.rebuilds += 1
+        if widget is None:
+            widget = self.widgets[key] = [draw_fn, args, None]
+            widget[2] = draw_fn(*args, surface=self.surface)
+            return [widget[2]]
+        old_rect = widget[2]
+        widget[0], widget[1] = draw_fn, args
+        self.repaint(old_rect)
+        self.repaint(widget[2])  # The new rect may reach past the old one
+        return [old_rect, widget[2]]
+
+    def repaint(self, region):
+        """Redraws every widget overlapping region, clipped to it."""
+        self.surface.set_clip(region)
+        self.surface.fill(self.background)
+        for widget in self.widgets.values():
+            if widget[2].colliderect(region):
+                widget[2] = widget[0](*widget[1], surface=self.surface)
+        self.surface.set_clip(None)
+
+
+class ScreenRenderer:
+    """Retained-mode renderer that only repaints widgets whose content changed.
+
+    Static widgets (buttons, cards, titles) are drawn with draw_static into
+    a StaticLayer per screen, and the window is restored from that layer
+    rather than redrawn. Dynamic widgets are drawn with draw(key, draw_fn,
+    *args) on top; the args double as the widget's content signature.
+
+    In "dirty" mode a widget is repainted only when its args differ from the
+    previous frame, its old area is restored from the layer, and just the
+    touched regions are pushed with pygame.display.update(rects). In "full"
+    mode every frame blits the whole layer, redraws the dynamic widgets and
+    flips.
+    """
+
+    def __init__(self, surface, background, mode="dirty"):
+        self.surface = surface
+        self.background = background
+        self.mode = mode
+        self.widgets = {}  # key -> (args, drawn rect); args None forces a redraw
+        self.layers = {}  # screen -> StaticLayer
+        self.layer = None
+        self.dirty_rects = []
+        self.screen = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Forces the next frame to repaint and present the whole window."""
+        self.full_redraw = True
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.invalidate()
+
+    def begin_frame(self, screen):
+        if screen != self.screen:
+            self.screen = screen
+            self.invalidate()
+        self.layer = self.layers.get(screen)
+        if self.layer is None:
+            self.layer = self.layers[screen] = StaticLayer(
+                self.surface.get_size(), self.background
+            )
+        if self.mode == "full" or self.full_redraw:
+            self.surface.blit(self.layer.surface, (0, 0))
+            self.widgets.clear()
+            self.full_redraw = True
+        self.dirty_rects = []
+
+    def erase(self, rect):
+        """Restores the static layer under rect."""
+        self.surface.blit(self.layer.surface, rect, rect)
+
+    def draw_static(self, key, draw_fn, *args):
+        """Bakes a static widget into the screen's layer if it changed."""
+        changed = self.layer.draw(key, draw_fn, *args)
+        if not changed:
+            return
+        for rect in changed:
+            self.erase(rect)
+            self.dirty_rects.append(rect)
+        # Dynamic widgets over the restored regions have to be drawn again
+        for key, (args, rect) in self.widgets.items():
+            if rect is not None and rect.collidelist(changed) != -1:
+                self.widgets[key] = (None, rect)
+
+    def draw(self, key, draw_fn, *args):
+        """Draws a widget unless it is unchanged since the last frame."""
+        previous = self.widgets.get(key)
+        if previous is not None and previous[0] == args:
+            return
+        if previous is not None and previous[1] is not None:
+            # Erase what the widget covered last time before repainting it
+            self.erase(previous[1])
+            self.dirty_rects.append(previous[1])
+        rect = draw_fn(*args)
+        self.widgets[key] = (args, rect)
+        if rect is not None:
+            self.dirty_rects.append(rect)
+
+    def draw_counter(self, key, counter, text):
+        """Draws a GlyphCounter, repainting only the glyphs that changed."""
+        previous = self.widgets.get(key)
+        if previous is not None and previous[0] == (text,):
+            return
+        redraw = previous is None or previous[0] is None
+        if previous is not None and previous[0] is None:
+            # Partly painted over by the layer; start the counter afresh
+            self.erase(previous[1])
+            self.dirty_rects.append(previous[1])
+        self.dirty_rects.extend(counter.draw(self.surface, self.erase, text, redraw))
+        self.widgets[key] = ((text,), counter.rect)
+
+    def end_frame(self):
+        """Presents the frame; returns whether anything was repainted."""
+        changed = self.full_redraw or bool(self.dirty_rects)
+        if self.mode == "full" or self.full_redraw:
+            pygame.display.flip()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.full_redraw = False
+        return changed
+
+
+class FrameScheduler:
+    """Picks the frame rate from window visibility, focus and recent input.
+
+    The simulation is fixed-step, so it stays exact at any frame rate; a
+    lower rate only means more steps are run per frame. Below ACTIVE_FPS
+    the loop sleeps in pygame.event.wait, so input still wakes it at once.
+    Render and simulation rates are measured over each second.
+    """
+
+    # Events that count as input and bring back the full frame rate
+    INPUT_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN)
+
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+        self.visible = True
+        self.focused = True
+        self.last_input_time = pygame.time.get_ticks()
+        self.last_frame_time = pygame.time.get_ticks()
+        # Totals
+        self.frames_rendered = 0
+        self.frames_changed = 0
+        self.frames_hidden = 0
+        self.sim_steps = 0
+        # Rates over the last whole second
+        self.render_rate = 0.0
+        self.sim_rate = 0.0
+        self.window_start = self.last_frame_time
+        self.window_frames = 0
+        self.window_steps = 0
+
+    def handle_event(self, event):
+        """Tracks visibility, focus and input; returns whether to repaint fully."""
+        if event.type in (pygame.WINDOWHIDDEN, pygame.WINDOWMINIMIZED):
+            self.visible = False
+        elif event.type in (pygame.WINDOWSHOWN, pygame.WINDOWRESTORED):
+            self.visible = True
+            return True
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+        elif event.type in self.INPUT_EVENTS:
+            self.last_input_time = pygame.time.get_ticks()
+        return False
+
+    def fps(self):
+        if not self.visible:
+            return HIDDEN_FPS
+        if (
+            self.focused
+            and pygame.time.get_ticks() - self.last_input_time < ACTIVE_MS
+        ):
+            return ACTIVE_FPS
+        return IDLE_FPS
+
+    def wait(self):
+        """Sleeps until the next frame is due or, when slowed down, until input."""
+        fps = self.fps()
+        if fps == ACTIVE_FPS:
+            self.clock.tick(fps)
+        else:
+            elapsed = pygame.time.get_ticks() - self.last_frame_time
+            timeout = 1000 // fps - elapsed
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    pygame.event.post(event)  # Handled by the frame it woke
+            self.clock.tick()
+        self.last_frame_time = pygame.time.get_ticks()
+
+    def frame_done(self, steps, rendered, changed=False):
+        """Records one loop iteration's simulation steps and rendering."""
+        self.sim_steps += steps
+        self.window_steps += steps
+        if rendered:
+            self.frames_rendered += 1
+            self.window_frames += 1
+            self.frames_changed += changed
+        else:
+            self.frames_hidden += 1
+        now = pygame.time.get_ticks()
+        if now - self.window_start >= 1000:
+            seconds = (now - self.window_start) / 1000
+            self.render_rate = self.window_frames / seconds
+            self.sim_rate = self.window_steps / seconds
+            self.window_start = now
+            self.window_frames = 0
+            self.window_steps = 0
+
+
+class HitGrid:
+    """Finds the widgets under a point without testing every widget.
+
+    The window is split into HIT_CELL_SIZE squares, and each cell lists the
+    widgets overlapping it, so a click tests only the few rects in its cell
+    however many widgets the screen has. Widgets are kept in the order they
+    were added, and every widget under the point is returned, as when each
+    button was checked in turn.
+
+    Handlers are called with the number of clicks; batch=False marks
+    widgets whose clicks must not be folded together (see InputBatcher).
+    """
+
+    def __init__(self, width, height, cell_size=HIT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.columns = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        self.cells = [[] for _ in range(self.columns * self.rows)]
+
+    def add(self, rect, handler, batch=True):
+        """Registers handler for clicks inside rect."""
+        size = self.cell_size
+        left = max(0, rect.left // size)
+        right = min(self.columns - 1, (rect.right - 1) // size)
+        top = max(0, rect.top // size)
+        bottom = min(self.rows - 1, (rect.bottom - 1) // size)
+        for row in range(top, bottom + 1):
+            for column in range(left, right + 1):
+                self.cells[row * self.columns + column].append((rect, handler, batch))
+
+    def hit(self, pos):
+        """Returns (handler, batch) of the widgets containing pos, in order."""
+        x, y = pos
+        column, row = x // self.cell_size, y // self.cell_size
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return []
+        cell = self.cells[row * self.columns + column]
+        return [(handler, batch) for rect, handler, batch in cell if rect.collidepoint(pos)]
+
+
+def create_save_store():
+    if SAVE_SLOT:
+        try:
+            return savestore.SqliteSaveStore(SAVE_DATABASE, SAVE_SLOT)
+        except ValueError as e:
+            print(f"Error opening save slot: {e}")
+            print(f"Using {SAVE_FILE} instead.")
+    return savestore.FileSaveStore(SAVE_FILE, LEGACY_SAVE_FILE)
 
 
 def save_game():
-    """Saves the current game state to a JSON file."""
-    game_state = {
-        "coins": coins,
-        "cps": cps,
-        "upgrade_cost": upgrade_cost,
-        "upgrade_amount": upgrade_amount,
-        "mega_upgrade_cost": mega_upgrade_cost,
-        "mega_upgrade_amount": mega_upgrade_amount,
-        "last_update_time": last_update_time,
-        "inventory": inventory,
-        "active_effects": active_effects,
-    }
-    try:
-        with open(SAVE_FILE, "w") as f:
-            json.dump(game_state, f)
-        print("Game saved successfully.")
-        set_message("Game Saved!")
-    except Exception as e:
-        print(f"Error saving game: {e}")
-        set_message("Save Failed!")
-
-
-def load_game():
-    """Loads the game state from a JSON file."""
-    global coins, cps, upgrade_cost, upgrade_amount, mega_upgrade_cost, mega_upgrade_amount, last_update_time, inventory, active_effects
-    if not os.path.exists(SAVE_FILE):
-        print("Save file does not exist.")
-        set_message("No Save Found!")
-        return
-    try:
-        with open(SAVE_FILE, "r") as f:
-            game_state = json.load(f)
-        coins = game_state.get("coins", 0)
-        cps = game_state.get("cps", 0)
-        upgrade_cost = game_state.get("upgrade_cost", 10)
-        upgrade_amount = game_state.get("upgrade_amount", 1)
-        mega_upgrade_cost = game_state.get("mega_upgrade_cost", 200)
-        mega_upgrade_amount = game_state.get("mega_upgrade_amount", 10)
-        last_update_time = game_state.get("last_update_time", pygame.time.get_ticks())
-        inventory = game_state.get("inventory", {"CPS Booster": 0})
-        # Reconstruct active_effects
-        loaded_active_effects = game_state.get("active_effects", [])
-        active_effects = []
-        current_time = pygame.time.get_ticks()
-        for active in loaded_active_effects:
-            if active["expires_at"] > current_time:
-                active_effects.append(active)
-                cps += active["effect"].get("cps_increase", 0)
-        print("Game loaded successfully.")
-        set_message("Game Loaded!")
-    except Exception as e:
-        print(f"Error loading game: {e}")
-        set_message("Load Failed!")
+    """Saves the game in the background; the result shows up as a message."""
+    game.save()
 
 
 def set_message(text, duration=2):
@@ -168,138 +698,133 @@ def set_message(text, duration=2):
     message_time = pygame.time.get_ticks() + duration * 1000
 
 
-def apply_effect(effect):
-    """Applies an effect to the game (e.g., CPS increase)."""
-    global cps
-    cps += effect.get("cps_increase", 0)
-    duration = effect.get("duration", 0)
-    if duration > 0:
-        expiration_time = pygame.time.get_ticks() + duration * 1000
-        active_effects.append({"effect": effect, "expires_at": expiration_time})
-        set_message(
-            f"Effect Applied: +{effect.get('cps_increase', 0)} CPS for {duration}s"
-        )
-    else:
-        set_message(f"Permanent Effect: +{effect.get('cps_increase', 0)} CPS")
-    try:
-        use_item_sound.play()
-    except:
-        pass  # Handle cases where sound isn't loaded
-
-
-def update_effects():
-    """Updates active effects, removing expired ones."""
-    global cps
-    current_time = pygame.time.get_ticks()
-    for active in active_effects[:]:
-        if current_time >= active["expires_at"]:
-            cps -= active["effect"].get("cps_increase", 0)
-            active_effects.remove(active)
-            set_message("Effect Expired!")
-
-
-def handle_main_game_events(event):
-    global coins, upgrade_cost, cps, current_screen, mega_upgrade_cost, mega_upgrade_amount
-    if event.type == pygame.MOUSEBUTTONDOWN:
-        mouse_pos = event.pos
-
-        # Check if collect button is clicked
-        if collect_button.collidepoint(mouse_pos):
-            coins += 1  # Add one coin per click
-            try:
-                click_sound.play()
-            except:
-                pass  # Handle cases where sound isn't loaded
-
-        # Check if upgrade button is clicked
-        if upgrade_button.collidepoint(mouse_pos):
-            if coins >= upgrade_cost:
-                coins -= upgrade_cost
-                cps += upgrade_amount
-                # Optionally, increase the cost for next upgrade
-                upgrade_cost = int(upgrade_cost * 1.5)
-                set_message("Upgrade Purchased!")
-                try:
-                    purchase_sound.play()
-                except:
-                    pass
-            else:
-                set_message("Not enough coins!")
-
-        # Check if mega upgrade button is clicked
-        if mega_upgrade_button.collidepoint(mouse_pos):
-            if coins >= mega_upgrade_cost:
-                coins -= mega_upgrade_cost
-                cps += mega_upgrade_amount
-                # Optionally, disable the button or increase the cost
-                set_message("Mega Upgrade Purchased!")
-                try:
-                    purchase_sound.play()
-                except:
-                    pass
-            else:
-                set_message("Not enough coins!")
+def buy_quantity():
+    return gamecore.BULK_QUANTITIES[buy_quantity_index]
 
-        # Check if save button is clicked
-        if save_button.collidepoint(mouse_pos):
-            save_game()
 
-        # Check if shop button is clicked
-        if SHOP_BUTTON.collidepoint(mouse_pos):
-            current_screen = SHOP_SCREEN
+def bulk_label(quantity):
+    return "Buy: Max" if quantity == gamecore.BUY_MAX else f"Buy: x{quantity}"
 
-        # Check if inventory button is clicked
-        if INVENTORY_BUTTON.collidepoint(mouse_pos):
-            current_screen = INVENTORY_SCREEN
 
+def upgrade_label(name, quote):
+    """Button label for buying the (levels, cost) quote of an upgrade."""
+    levels, cost = quote
+    cost = numformat.format_number(cost)
+    if buy_quantity() == 1:
+        return f"{name}\nCost: {cost}"
+    return f"{name} x{numformat.format_number(levels)}\nCost: {cost}"
 
-def handle_shop_events(event):
-    global current_screen, coins
-    if event.type == pygame.MOUSEBUTTONDOWN:
-        mouse_pos = event.pos
 
-        # Iterate through shop item buttons
-        for idx, item_key in enumerate(SHOP_ITEMS):
-            item = SHOP_ITEMS[item_key]
-            button = shop_item_buttons[idx]
-            if button.collidepoint(mouse_pos):
-                if coins >= item["cost"]:
-                    coins -= item["cost"]
-                    inventory[item_key] += 1
-                    set_message(f"Purchased {item['name']}!")
-                    try:
-                        purchase_sound.play()
-                    except:
-                        pass
-                else:
-                    set_message("Not enough coins!")
+# Click handlers, one per widget. Each takes the number of clicks it
+# stands for, since clicks on the same widget are applied in batches.
+
+
+def repeat(action, count, *args):
+    """Calls action(*args) up to count times, until it fails; returns the successes."""
+    for done in range(count):
+        if not action(*args):
+            return done
+    return count
+
+
+def on_collect(clicks):
+    game.collect(clicks)  # One coin per click
+    play_sound("click")
+
+
+def on_upgrade(clicks):
+    if repeat(game.buy_upgrade, clicks, buy_quantity()):
+        play_sound("purchase")
+
+
+def on_mega_upgrade(clicks):
+    if repeat(game.buy_mega_upgrade, clicks, buy_quantity()):
+        play_sound("purchase")
+
+
+def on_bulk(clicks):
+    global buy_quantity_index
+    buy_quantity_index = (buy_quantity_index + clicks) % len(gamecore.BULK_QUANTITIES)
 
-        # Check if back button is clicked
-        if shop_back_button.collidepoint(mouse_pos):
-            current_screen = MAIN_GAME
 
+def on_save(clicks):
+    save_game()
 
-def handle_inventory_events(event):
+
+def on_buy_item(item_key, clicks):
+    if repeat(game.buy_item, clicks, item_key):
+        play_sound("purchase")
+
+
+def on_use_item(item_key, clicks):
+    if repeat(game.use_item, clicks, item_key):
+        play_sound("use_item")
+
+
+def go_to(screen, clicks):
     global current_screen
-    if event.type == pygame.MOUSEBUTTONDOWN:
-        mouse_pos = event.pos
-
-        # Iterate through inventory item buttons
-        for idx, item_key in enumerate(inventory):
-            if inventory[item_key] > 0:
-                button = inventory_item_buttons[idx]
-                if button.collidepoint(mouse_pos):
-                    # Use the item
-                    inventory[item_key] -= 1
-                    apply_effect(SHOP_ITEMS[item_key]["effect"])
-                    try:
-                        use_item_sound.play()
-                    except:
-                        pass
-
-        # Check if back button is clicked
-        if inventory_back_button.collidepoint(mouse_pos):
-            current_screen = MAIN_GAME
+    current_screen = screen
+
+
+class InputBatcher:
+    """Folds runs of clicks on the same widget into one batched action.
+
+    Auto-clickers send dozens of clicks a frame, nearly all on one button.
+    Consecutive clicks that hit the same widget, and only that widget, are
+    counted instead of handled, and the run is applied with one handler
+    call when a click lands elsewhere or the frame's events are done. The
+    order of actions is kept, so the outcome is the same as one by one.
+    Widgets that switch screens aren't batched, as the next click at the
+    same spot lands on another screen.
+    """
+
+    def __init__(self):
+        self.pending = None  # Handler of the run being counted
+        self.pending_clicks = 0
+        self.events_processed = 0  # Events read in the last frame
+        self.total_events = 0
+        self.clicks_folded = 0  # Clicks applied as part of a batch
+
+    def click(self, pos):
+        hits = HIT_GRIDS[current_screen].hit(pos)
+        if len(hits) == 1 and hits[0][1]:
+            handler = hits[0][0]
+            if handler is self.pending:
+                self.pending_clicks += 1
+                self.clicks_folded += 1
+                return
+            self.flush()
+            self.pending, self.pending_clicks = handler, 1
+            return
+        self.flush()
+        for handler, _ in hits:
+            handler(1)
+
+    def flush(self):
+        """Applies the run of clicks being counted, if any."""
+        if self.pending is not None:
+            handler, clicks = self.pending, self.pending_clicks
+            self.pending, self.pending_clicks = None, 0
+            handler(clicks)
+
+    def end_frame(self, events):
+        """Applies the last run of the frame and counts the frame's events."""
+        self.flush()
+        self.events_processed = events
+        self.total_events += events
+
+
+# Clicks are dispatched through this batcher
+INPUT = InputBatcher()
+
+
+def handle_click(event):
+    """Dispatches a click to the widgets under it on the current screen."""
+    INPUT.click(event.pos)
+
+
+# Event type -> handler; other events need nothing from the screens
+EVENT_HANDLERS = {pygame.MOUSEBUTTONDOWN: handle_click}
 
 
 # Define button rectangles
@@ -319,6 +844,11 @@ mega_upgrade_button = pygame.Rect(
     WIDTH // 2 + 10, HEIGHT // 2 + 50 + 60, button_width, button_height
 )  # Positioned below the save button
 
+# Define bulk quantity button, below the save button
+bulk_button = pygame.Rect(
+    WIDTH // 2 - button_width - 10, HEIGHT // 2 + 50 + 60, button_width, button_height
+)
+
 # Define shop and inventory buttons
 SHOP_BUTTON = pygame.Rect(50, HEIGHT - 70, 100, 50)
 INVENTORY_BUTTON = pygame.Rect(WIDTH - 150, HEIGHT - 70, 130, 50)
@@ -356,141 +886,286 @@ def create_inventory_item_buttons():
     start_x = WIDTH // 2 - 200
     start_y = 100
     spacing_y = 120
-    for idx, item_key in enumerate(inventory):
+    for idx, item_key in enumerate(SHOP_ITEMS):  # The inventory holds shop items
         rect = pygame.Rect(start_x, start_y + idx * spacing_y, 200, 80)
         inventory_item_buttons.append(rect)
 
 
 create_inventory_item_buttons()
 
-# Initialize message variables
-message = ""
-message_time = 0  # Time when the message should disappear
 
-# Auto-load the game on start
-load_game()
-
-# Game loop
-clock = pygame.time.Clock()
-FPS = 60  # Frames per second
-
-running = True
-while running:
-    clock.tick(FPS)  # Maintain frame rate
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            save_game()
-            running = False
-
-        if current_screen == MAIN_GAME:
-            handle_main_game_events(event)
-        elif current_screen == SHOP_SCREEN:
-            handle_shop_events(event)
-        elif current_screen == INVENTORY_SCREEN:
-            handle_inventory_events(event)
-
-    # Update coins based on CPS
-    current_time = pygame.time.get_ticks()
-    elapsed_time = (current_time - last_update_time) / 1000  # Convert to seconds
-    if elapsed_time >= 1:
-        coins += cps * int(elapsed_time)
-        last_update_time = current_time
-
-        # Check if it's time to auto-save (optional)
-        # For example, auto-save every 60 seconds
-        AUTO_SAVE_INTERVAL = 60  # seconds
-        if (
-            current_time - getattr(load_game, "last_auto_save_time", 0)
-        ) / 1000 >= AUTO_SAVE_INTERVAL:
-            save_game()
-            load_game.last_auto_save_time = current_time
+def build_hit_grids():
+    """Registers every screen's clickable widgets with their click handlers."""
+    main = HitGrid(WIDTH, HEIGHT)
+    main.add(collect_button, on_collect)
+    main.add(upgrade_button, on_upgrade)
+    main.add(mega_upgrade_button, on_mega_upgrade)
+    main.add(bulk_button, on_bulk)
+    main.add(save_button, on_save)
+    main.add(SHOP_BUTTON, partial(go_to, SHOP_SCREEN), batch=False)
+    main.add(INVENTORY_BUTTON, partial(go_to, INVENTORY_SCREEN), batch=False)
+
+    shop = HitGrid(WIDTH, HEIGHT)
+    for idx, item_key in enumerate(SHOP_ITEMS):
+        shop.add(shop_item_buttons[idx], partial(on_buy_item, item_key))
+    shop.add(shop_back_button, partial(go_to, MAIN_GAME), batch=False)
+
+    # The inventory holds every shop item, in shop order
+    inventory = HitGrid(WIDTH, HEIGHT)
+    for idx, item_key in enumerate(SHOP_ITEMS):
+        inventory.add(inventory_item_buttons[idx], partial(on_use_item, item_key))
+    inventory.add(inventory_back_button, partial(go_to, MAIN_GAME), batch=False)
+
+    return {MAIN_GAME: main, SHOP_SCREEN: shop, INVENTORY_SCREEN: inventory}
+
+
+HIT_GRIDS = build_hit_grids()
+
 
-    # Update active effects
-    update_effects()
+def draw_frame(renderer, coins_counter, cps_counter):
+    """Draws the current screen; renderer.end_frame() presents it."""
+    global message
 
-    # Draw everything based on current screen
-    WIN.fill(WHITE)
+    renderer.begin_frame(current_screen)
 
     if current_screen == MAIN_GAME:
+        # Buttons are baked into the screen's static layer, and only
+        # redrawn there when a label changes
+        renderer.draw_static("collect", draw_button, collect_button, GREEN, "Collect")
+        renderer.draw_static(
+            "upgrade",
+            draw_button,
+            upgrade_button,
+            GRAY,
+            upgrade_label("Upgrade", game.upgrade_quote(buy_quantity())),
+        )
+        renderer.draw_static("save", draw_button, save_button, BLUE, "Save")
+        renderer.draw_static(
+            "mega_upgrade",
+            draw_button,
+            mega_upgrade_button,
+            RED,
+            upgrade_label("Mega Upgrade", game.mega_upgrade_quote(buy_quantity())),
+        )
+        renderer.draw_static(
+            "bulk", draw_button, bulk_button, LIGHT_GRAY, bulk_label(buy_quantity())
+        )
+        renderer.draw_static("shop", draw_button, SHOP_BUTTON, YELLOW, "Shop")
+        renderer.draw_static(
+            "inventory", draw_button, INVENTORY_BUTTON, YELLOW, "Inventory"
+        )
+
         # Display coins and CPS
-        draw_text(f"Coins: {coins}", FONT, BLACK, WIN, WIDTH // 2, 30)
-        draw_text(f"CPS: {cps}", FONT, BLACK, WIN, WIDTH // 2, 60)
-
-        # Draw buttons
-        draw_button(collect_button, GREEN, "Collect")
-        draw_button(upgrade_button, GRAY, f"Upgrade\nCost: {upgrade_cost}")
-        draw_button(save_button, BLUE, "Save")
-        draw_button(
-            mega_upgrade_button, RED, f"Mega Upgrade\nCost: {mega_upgrade_cost}"
+        # Counters only change when the formatted number does, and then
+        # only the glyphs that differ are repainted
+        renderer.draw_counter(
+            "coins", coins_counter, numformat.format_number(game.coins)
         )
-        draw_button(SHOP_BUTTON, YELLOW, "Shop")
-        draw_button(INVENTORY_BUTTON, YELLOW, "Inventory")
+        renderer.draw_counter("cps", cps_counter, numformat.format_number(game.cps))
 
     elif current_screen == SHOP_SCREEN:
         # Title
-        draw_text("Shop", BIG_FONT, BLACK, WIN, WIDTH // 2, 50)
+        renderer.draw_static("title", draw_title, "Shop")
 
         # Draw shop items
         for idx, item_key in enumerate(SHOP_ITEMS):
             item = SHOP_ITEMS[item_key]
-            button = shop_item_buttons[idx]
-            pygame.draw.rect(WIN, LIGHT_GRAY, button)
-            draw_text(item["name"], FONT, BLACK, WIN, button.centerx, button.y + 20)
-            draw_text(
-                f"Cost: {item['cost']} coins",
-                FONT,
-                BLACK,
-                WIN,
-                button.centerx,
-                button.y + 50,
+            lines = (
+                (item["name"], 20),
+                (f"Cost: {numformat.format_number(item['cost'])} coins", 50),
+                (
+                    f"+{item['effect']['cps_increase']} CPS\nfor {item['effect']['duration']}s",
+                    80,
+                ),
             )
-            draw_text(
-                f"+{item['effect']['cps_increase']} CPS\nfor {item['effect']['duration']}s",
-                FONT,
-                BLACK,
-                WIN,
-                button.centerx,
-                button.y + 80,
+            renderer.draw_static(
+                ("shop_item", item_key), draw_card, shop_item_buttons[idx], lines
             )
 
         # Draw back button
-        draw_button(shop_back_button, RED, "Back")
+        renderer.draw_static("back", draw_button, shop_back_button, RED, "Back")
 
     elif current_screen == INVENTORY_SCREEN:
         # Title
-        draw_text("Inventory", BIG_FONT, BLACK, WIN, WIDTH // 2, 50)
-
-        # Draw inventory items
-        for idx, item_key in enumerate(inventory):
-            item = SHOP_ITEMS.get(item_key, {})
-            button = inventory_item_buttons[idx]
-            pygame.draw.rect(WIN, LIGHT_GRAY, button)
-            draw_text(item_key, FONT, BLACK, WIN, button.centerx, button.y + 20)
-            draw_text(
-                f"Quantity: {inventory[item_key]}",
-                FONT,
-                BLACK,
-                WIN,
-                button.centerx,
-                button.y + 50,
+        renderer.draw_static("title", draw_title, "Inventory")
+
+        # Draw inventory items; a card is rebaked when its quantity changes
+        for idx, item_key in enumerate(game.inventory):
+            lines = ((item_key, 20), (f"Quantity: {game.inventory[item_key]}", 50))
+            if game.inventory[item_key] > 0:
+                lines += (("Click to Use", 80),)
+            renderer.draw_static(
+                ("inventory_item", item_key), draw_card, inventory_item_buttons[idx], lines
             )
-            if inventory[item_key] > 0:
-                draw_text(
-                    "Click to Use", FONT, BLACK, WIN, button.centerx, button.y + 80
-                )
 
         # Draw back button
-        draw_button(inventory_back_button, RED, "Back")
+        renderer.draw_static("back", draw_button, inventory_back_button, RED, "Back")
 
     # Draw message if any
-    if message and pygame.time.get_ticks() < message_time:
-        draw_text(message, FONT, RED, WIN, WIDTH // 2, HEIGHT - 30)
-    elif pygame.time.get_ticks() >= message_time:
+    if message and pygame.time.get_ticks() >= message_time:
         message = ""
+    renderer.draw("message", draw_message, message)
+
+
+def main():
+    global WIN, FONT, BIG_FONT, SMALL_FONT, game
+    launch_time = time.perf_counter()
+
+    # Initialize Pygame
+    pygame.init()
+
+    # Initialize Pygame mixer for sounds
+    pygame.mixer.init()
+
+    # Sound effects and music load while the rest starts up and the game
+    # runs; each is put to use as it arrives
+    start_loading_assets()
+
+    # Set up display
+    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Clicky!")
+
+    # Keep unused events out of the queue
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENTS)
+
+    # Set up fonts, found through the font cache rather than a system scan
+    fonts = fontcache.FontRegistry()
+    warm_fonts = "arial" in fonts.paths
+    FONT = fonts.get("arial", 24)
+    BIG_FONT = fonts.get("arial", 32)
+    SMALL_FONT = fonts.get("arial", 14)
+
+    # Number labels, shared with gamecore's messages
+    numformat.DEFAULT_FORMATTER = numformat.NumberFormatter(NUMBER_STYLE)
+
+    # Auto-load the game on start
+    game = gamecore.Game(store=create_save_store(), clock=pygame.time.get_ticks)
+    game.on_message = set_message
+    game.load()
+
+    # Renderer for the main window
+    renderer = ScreenRenderer(WIN, WHITE, RENDER_MODE)
+    coins_counter = GlyphCounter(glyph_atlas(FONT, BLACK), "Coins: ", WIDTH // 2, 30)
+    cps_counter = GlyphCounter(glyph_atlas(FONT, BLACK), "CPS: ", WIDTH // 2, 60)
+
+    # Game loop, paced by the scheduler
+    scheduler = FrameScheduler()
+    start_time = pygame.time.get_ticks()
+
+    # Every frame is timed phase by phase; slow frames are only logged
+    # while the overlay is shown. Effects run inside the game update, so
+    # they are timed by wrapping the method.
+    profiler = frameprofiler.FrameProfiler(log=print if PROFILE else None)
+    game.update_effects = profiler.timed("effects", game.update_effects)
+    show_profiler = PROFILE
+    overlay = (None, ())
+    overlay_time = 0
+    first_frame_ms = None
+
+    running = True
+    while running:
+        scheduler.wait()
+        profiler.begin_frame()
+
+        events = pygame.event.get()
+        profiler.mark("events")
+
+        use_loaded_assets()
+        profiler.mark("assets")
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                INPUT.flush()  # Clicks earlier in this frame belong in the final save
+                save_game()
+                running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
+            elif scheduler.handle_event(event):
+                renderer.invalidate()
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_profiler = not show_profiler
+                profiler.log = print if show_profiler else None
+                overlay_time = 0
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                try:
+                    rows = profiler.dump(PROFILE_FILE)
+                except OSError as e:
+                    print(f"Error writing frame times: {e}")
+                    set_message("Couldn't write frame times!")
+                else:
+                    set_message(f"Wrote {rows} frame times to {PROFILE_FILE}")
+                    print("\n".join(profiler.summary()))
+
+            handler = EVENT_HANDLERS.get(event.type)
+            if handler is not None:
+                handler(event)
+        # Apply the last run of batched clicks
+        INPUT.end_frame(len(events))
+        profiler.mark("dispatch")
+
+        # Update coins and effects, journal changes and autosave
+        steps = game.update(pygame.time.get_ticks())
+        profiler.mark("update")
+
+        # Draw the current screen, unless the window can't be seen
+        if scheduler.visible:
+            draw_frame(renderer, coins_counter, cps_counter)
+            # The overlay's numbers change every frame, so they are only
+            # refreshed a few times a second to keep repaints small
+            now = pygame.time.get_ticks()
+            if not show_profiler:
+                overlay = (None, ())
+            elif now - overlay_time >= PROFILE_REFRESH_MS:
+                overlay = (
+                    profiler_lines(profiler, scheduler),
+                    tuple(profiler.sparkline(PROFILE_SPARK_FRAMES)),
+                )
+                overlay_time = now
+            renderer.draw("profiler", draw_profiler_overlay, *overlay)
+            profiler.mark(f"draw_{current_screen}")
+            changed = renderer.end_frame()
+            profiler.mark("present")
+            scheduler.frame_done(steps, True, changed)
+            if first_frame_ms is None:
+                first_frame_ms = (time.perf_counter() - launch_time) * 1000
+        else:
+            scheduler.frame_done(steps, False)
+        profiler.end_frame()
+
+    # Make sure the final save reaches the disk before exiting
+    game.close()
+    worker = game.save_worker
+    print(
+        f"Saves: {worker.saves_written} written, {worker.saves_coalesced} coalesced, "
+        f"{worker.bytes_written} bytes, last took {worker.last_latency_ms:.1f} ms"
+    )
+    seconds = max(1, pygame.time.get_ticks() - start_time) / 1000
+    print(
+        f"Frames: {scheduler.frames_rendered} rendered "
+        f"({scheduler.frames_rendered / seconds:.1f}/s, {scheduler.frames_changed} changed), "
+        f"{scheduler.frames_hidden} skipped while hidden"
+    )
+    print(f"Simulation: {scheduler.sim_steps} steps ({scheduler.sim_steps / seconds:.1f}/s)")
+    print(f"Input: {INPUT.total_events} events, {INPUT.clicks_folded} clicks batched")
+    print("Sounds: " + "; ".join(sound_pool.summary()))
+    asset_manager.shutdown()
+    if first_frame_ms is not None:
+        print(
+            f"Startup: first frame after {first_frame_ms:.1f} ms "
+            f"({'warm' if warm_fonts else 'cold'} font cache, "
+            f"fonts found in {fonts.resolve_ms:.1f} ms)"
+        )
+    print("Assets: " + "; ".join(asset_manager.report()))
+    if profiler.frames:
+        print(f"Frame times ({profiler.slow_frames} slow):")
+        for line in profiler.summary():
+            print(f"  {line}")
+
+    pygame.quit()
+    sys.exit()
 
-    # Update the display
-    pygame.display.flip()
 
-pygame.quit()
-sys.exit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import bisect
+import math
+import sys
+from fractions import Fraction
+
+import bignum
+
+
+class CostCurve:
+    """Price of each level of something that can be bought repeatedly.
+
+    price(n) is the cost of level n (counting from 0) and cumulative(n) the
+    cost of the first n levels. Curves whose prices depend on the previous
+    price keep them in a table with running totals that is extended lazily,
+    so after the first lookup both are list indexing. Once a table's price
+    stops changing, the rest of the curve is a constant tail handled with
+    arithmetic instead of an ever-growing table.
+    """
+
+    def __init__(self):
+        self.prices = []
+        self.totals = [0]  # totals[n] = cost of the first n levels
+        self.index = {}  # price -> first level with that price
+        self.constant = False  # True once the last price repeats forever
+
+    def _next_price(self):
+        """Returns the price of level len(self.prices), or None if it repeats."""
+        raise NotImplementedError
+
+    def _extend(self):
+        price = self._next_price()
+        if price is None:
+            self.constant = True
+            return
+        self.index.setdefault(price, len(self.prices))
+        self.prices.append(price)
+        self.totals.append(self.totals[-1] + price)
+
+    def price(self, n):
+        """Returns the price of level n."""
+        while n >= len(self.prices) and not self.constant:
+            self._extend()
+        return self.prices[min(n, len(self.prices) - 1)]
+
+    def cumulative(self, n):
+        """Returns the cost of levels 0 to n - 1."""
+        while n >= len(self.totals) and not self.constant:
+            self._extend()
+        if n < len(self.totals):
+            return self.totals[n]
+        # Past the last distinct price every level costs the same
+        return self.totals[-1] + (n - len(self.prices)) * self.prices[-1]
+
+    def total(self, start, count):
+        """Returns the cost of count levels beginning at level start."""
+        return self.cumulative(start + count) - self.cumulative(start)
+
+    def level_of(self, price):
+        """Returns the first level costing price, or None if there is none.
+
+        Only searches as far as price, so this assumes prices never fall.
+        """
+        while (
+            price not in self.index
+            and not self.constant
+            and (not self.prices or self.prices[-1] < price)
+        ):
+            self._extend()
+        return self.index.get(price)
+
+    def locate(self, price):
+        """Returns (curve, level) where curve's level costs price.
+
+        Saves store the current price rather than the level, so this is how
+        a loaded game finds its place on the curve again.
+        """
+        level = self.level_of(price)
+        if level is None:
+            raise ValueError(f"No level costs {price}")
+        return self, level
+
+    def max_affordable(self, start, coins, limit=None):
+        """Returns how many levels from start the coins can pay for."""
+        budget = self.cumulative(start) + coins
+        while not self.constant and self.totals[-1] <= budget:
+            if limit is not None and len(self.totals) - 1 - start >= limit:
+                break
+            self._extend()
+        count = bisect.bisect_right(self.totals, budget) - 1 - start
+        if self.constant and count == len(self.prices) - start:
+            # Affordable into the constant tail, which is plain division
+            price = self.prices[-1]
+            leftover = budget - self.totals[-1]
+            count += leftover // price if price > 0 else (limit or 0)
+        if limit is not None:
+            count = min(count, limit)
+        return self._fit(start, coins, max(0, count))
+
+    def _fit(self, start, coins, count):
+        """Lowers count until its total fits in coins.
+
+        Past bignum.EXACT_LIMIT sums round, and a quotient can come out a
+        hair too large to pay for. Below it, count is returned as an int.
+        """
+        if count < bignum.EXACT_LIMIT:
+            count = int(count)  # Exact, and usable as a table index
+        while count > 0 and self.total(start, count) > coins:
+            if count < bignum.EXACT_LIMIT:
+                count -= 1
+            else:
+                count = count * (1 - 2**-50)  # A few units in the last place
+        return count
+
+
+class GeometricCurve(CostCurve):
+    """Each level costs int(previous price * growth), starting at base.
+
+    This is how Clicky's upgrades have always been priced, rounding included,
+    so the table matches buying one level at a time exactly. Past
+    bignum.EXACT_LIMIT prices become BigNumbers, which are whole numbers at
+    that size anyway, so the curve keeps going past 1e308.
+    """
+
+    def __init__(self, base, growth):
+        super().__init__()
+        self.base = base
+        self.growth = growth
+        self.resumed = {}  # Start price -> curve continued from it, for off-curve saves
+
+    def _next_price(self):
+        if not self.prices:
+            return self.base
+        last = self.prices[-1]
+        if last < bignum.EXACT_LIMIT:
+            price = int(last * self.growth)
+        else:
+            price = bignum.BigNumber(last) * self.growth
+        # Growth 1, or a price small enough to round back to itself, repeats
+        return None if price == last else price
+
+    def locate(self, price):
+        """Like CostCurve.locate, but continues the curve from unknown prices.
+
+        Buying along a resumed curve reaches more prices that aren't on this
+        one, so those are looked up on the resumed curves before a new one
+        is started.
+        """
+        level = self.level_of(price)
+        if level is not None:
+            return self, level
+        for curve in self.resumed.values():
+            level = curve.level_of(price)
+            if level is not None:
+                return curve, level
+        curve = self.resumed[price] = GeometricCurve(price, self.growth)
+        return curve, 0
+
+
+class PolynomialCurve(CostCurve):
+    """Level n costs coefficients[0] + coefficients[1] * n + ...
+
+    Coefficients are ints, so prices are exact. Both price(n) and
+    cumulative(n) are closed-form (cumulative via Faulhaber's formula), and
+    max_affordable is a binary search over cumulative, so nothing is tabled.
+    A curve with only a constant term is handled like a table's constant
+    tail. The searches rely on prices never falling from one level to the
+    next, so coefficients for which they fall anywhere are rejected.
+    """
+
+    def __init__(self, coefficients):
+        super().__init__()
+        coefficients = list(coefficients)
+        while len(coefficients) > 1 and not coefficients[-1]:
+            coefficients.pop()  # Zero high powers would only slow things down
+        if not coefficients or _falls(_difference(coefficients)):
+            raise ValueError(f"Prices must not fall: {tuple(coefficients)}")
+        self.coefficients = tuple(coefficients)
+        self.constant = len(self.coefficients) == 1
+        # cumulative(n) as a polynomial in n, lowest power first
+        sums = [Fraction(0)] * (len(self.coefficients) + 1)
+        for power, coefficient in enumerate(self.coefficients):
+            for exponent, term in enumerate(_power_sum(power)):
+                sums[exponent] += coefficient * term
+        self.sum_coefficients = sums
+
+    def price(self, n):
+        return sum(c * n**i for i, c in enumerate(self.coefficients))
+
+    def cumulative(self, n):
+        total = sum(c * n**i for i, c in enumerate(self.sum_coefficients))
+        return int(total)  # Exact: the sum of int prices is an int
+
+    def level_of(self, price):
+        if self.constant:
+            return 0 if price == self.coefficients[0] else None
+        low, high = 0, 1
+        while self.price(high) < price:
+            low, high = high, high * 2  # Prices grow without bound, so this stops
+        while low < high:
+            mid = (low + high) // 2
+            if self.price(mid) < price:
+                low = mid + 1
+            else:
+                high = mid
+        return low if self.price(low) == price else None
+
+    def max_affordable(self, start, coins, limit=None):
+        if self.constant:
+            # Every level costs the same, so this is plain division
+            price = self.coefficients[0]
+            count = coins // price if price > 0 else (limit or 0)
+            count = max(0, int(count))
+            return self._fit(start, coins, count if limit is None else min(count, limit))
+        budget = self.cumulative(start) + coins
+        high = 1
+        while self.cumulative(start + high) <= budget:
+            if limit is not None and high >= limit:
+                return limit
+            high *= 2
+        low = 0  # Largest count known to be affordable
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self.cumulative(start + mid) <= budget:
+                low = mid
+            else:
+                high = mid
+        return low if limit is None else min(low, limit)
+
+
+class TableCurve(CostCurve):
+    """Prices listed level by level; the last one repeats forever after."""
+
+    def __init__(self, prices):
+        super().__init__()
+        self.table = tuple(prices)
+        if not self.table:
+            raise ValueError("A table curve needs at least one price")
+
+    def _next_price(self):
+        n = len(self.prices)
+        return self.table[n] if n < len(self.table) else None
+
+
+def _evaluate(poly, n):
+    return sum(c * n**i for i, c in enumerate(poly))
+
+
+def _difference(poly):
+    """Returns the coefficients of poly(n + 1) - poly(n), lowest power first."""
+    difference = [0] * max(len(poly) - 1, 1)
+    for power, coefficient in enumerate(poly):
+        for exponent in range(power):
+            difference[exponent] += coefficient * math.comb(power, exponent)
+    return difference
+
+
+def _falls(poly):
+    """Returns whether poly (int coefficients) is negative at any integer n >= 0."""
+    while len(poly) > 1 and not poly[-1]:
+        poly = poly[:-1]
+    if len(poly) == 1 or poly[-1] < 0:
+        return poly[-1] < 0  # Negative for every n large enough
+    # Past this (Cauchy's bound on the roots) poly has the sign of poly[-1]
+    bound = 1 + -(-max(abs(c) for c in poly) // poly[-1])
+    return any(_evaluate(poly, n) < 0 for n in _turning_points(poly, 0, bound))
+
+
+def _turning_points(poly, low, high):
+    """Returns integers from low to high, both included, between which poly is monotone.
+
+    Neighbouring points either bound a stretch where poly is monotone or are
+    one apart, so poly's smallest value at an integer is at one of them.
+    Between the slope's own turning points the slope is monotone, so it
+    changes sign at most once there, and integer bisection narrows that
+    down to a unit step.
+    """
+    slope = [c * i for i, c in enumerate(poly)][1:]
+    if len(slope) < 2:
+        return {low, high}  # poly is linear, so monotone throughout
+    points = _turning_points(slope, low, high)
+    edges = sorted(points)
+    for a, b in zip(edges, edges[1:]):
+        sign = _evaluate(slope, a) > 0
+        if sign == (_evaluate(slope, b) > 0):
+            continue
+        while b - a > 1:
+            mid = (a + b) // 2
+            if (_evaluate(slope, mid) > 0) == sign:
+                a = mid
+            else:
+                b = mid
+        points.update((a, b))
+    return points
+
+
+def _power_sum(power):
+    """Returns the coefficients of sum(k**power for k in range(n)) in n.
+
+    Faulhaber's formula, lowest power of n first.
+    """
+    bernoulli = _bernoulli(power)
+    coefficients = [Fraction(0)] * (power + 2)
+    for j in range(power + 1):
+        coefficients[power + 1 - j] += (
+            Fraction(math.comb(power + 1, j)) * bernoulli[j] / (power + 1)
+        )
+    return coefficients
+
+
+def _bernoulli(count):
+    """Returns Bernoulli numbers B_0..B_count, with B_1 = -1/2."""
+    numbers = []
+    for m in range(count + 1):
+        value = Fraction(1) if m == 0 else Fraction(0)
+        for k in range(m):
+            value -= Fraction(math.comb(m + 1, k)) * numbers[k] / (m + 1)
+        numbers.append(value)
+    return numbers
+
+
+if __name__ == "__main__":
+    # Usage: python costcurve.py level  -> prints the upgrade prices at level
+    import gamecore
+
+    level = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    for name, curve in (
+        ("Upgrade", gamecore.UPGRADE_CURVE),
+        ("Mega Upgrade", gamecore.MEGA_UPGRADE_CURVE),
+    ):
+        print(f"{name} level {level}: {curve.price(level)}")
+        print(f"  levels 0-{level} together: {curve.cumulative(level + 1)}")
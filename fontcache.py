@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import time
+
+import pygame
+
+# Where resolved font paths are remembered between launches
+FONT_CACHE_FILE = "fontcache.json"
+
+
+class FontRegistry:
+    """Resolves font names to files once and keeps a Font per size.
+
+    Finding a system font by name makes pygame enumerate every installed
+    font, which is slow with large font directories. The name -> path
+    mapping is saved in cache_file, so later launches open the file
+    directly, and only scan again if the file has gone away. A name with
+    no match (or None) gets pygame's bundled default font; that outcome is
+    cached too, so delete the cache file after installing a font.
+    """
+
+    def __init__(self, cache_file=FONT_CACHE_FILE):
+        self.cache_file = cache_file
+        self.paths = {}  # name -> font file, or None for the default font
+        self.fonts = {}  # (name, size) -> Font
+        self.scans = 0  # Names looked up by enumerating system fonts
+        self.resolve_ms = 0.0  # Time spent finding font files
+        if cache_file is not None:
+            try:
+                with open(cache_file, encoding="utf-8") as f:
+                    self.paths = json.load(f)
+            except (OSError, ValueError):
+                pass  # No usable cache: names are looked up again
+
+    def path(self, name):
+        """Returns the font file for name, or None for the default font."""
+        if name is None:
+            return None
+        start = time.perf_counter()
+        path = self.paths.get(name)
+        if name not in self.paths or (path is not None and not os.path.exists(path)):
+            path = self.paths[name] = pygame.font.match_font(name)
+            self.scans += 1
+            self._save()
+        self.resolve_ms += (time.perf_counter() - start) * 1000
+        return path
+
+    def _save(self):
+        if self.cache_file is None:
+            return
+        temp_file = self.cache_file + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self.paths, f, indent=2)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            print(f"Error saving font cache: {e}")
+
+    def get(self, name, size):
+        """Returns the Font for name at size, opening it on first use."""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(self.path(name), size)
+        return font
+
+
+if __name__ == "__main__":
+    # Usage: python fontcache.py [font name]  -> times finding the font; run
+    # it twice to compare a cold lookup with one from the cache file
+    name = sys.argv[1] if len(sys.argv) > 1 else "arial"
+    pygame.font.init()
+    registry = FontRegistry()
+    cached = name in registry.paths
+    registry.get(name, 24)
+    print(
+        f"{name}: {registry.path(name) or 'default font'}, "
+        f"{'warm' if cached else 'cold'} lookup took {registry.resolve_ms:.1f} ms"
+    )
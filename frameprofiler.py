@@ -0,0 +1,130 @@
+import collections
+import csv
+import time
+
+# Frames kept for percentiles, the sparkline and dumps (10 s at 60 fps)
+HISTORY_FRAMES = 600
+
+# Frames slower than this are logged with their phase breakdown
+SLOW_FRAME_MS = 50
+
+
+class FrameProfiler:
+    """Times the phases of each frame of the main loop.
+
+    The loop calls begin_frame(), then mark(phase) after each phase, which
+    books the time since the previous mark to that phase, and end_frame().
+    Work nested inside a phase (like update_effects inside the game update)
+    is timed by wrapping the function with timed(); its time is booked to
+    its own phase and taken out of the enclosing one.
+
+    The last HISTORY_FRAMES frames are kept in a ring buffer, which is what
+    percentiles(), sparkline() and dump() read. Sleeping between frames is
+    not part of any phase, so a frame's total is the work it did.
+    """
+
+    def __init__(self, history=HISTORY_FRAMES, slow_frame_ms=SLOW_FRAME_MS, log=print):
+        self.frames = collections.deque(maxlen=history)  # (total ms, {phase: ms})
+        self.slow_frame_ms = slow_frame_ms
+        self.log = log
+        self.phases = {}  # Phases of the frame in progress
+        self.phase_names = []  # Every phase seen, in first-seen order
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.nested_ms = 0.0
+        self.frame_count = 0
+        self.slow_frames = 0
+
+    def begin_frame(self):
+        self.phases = {}
+        self.nested_ms = 0.0
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def _add(self, phase, elapsed_ms):
+        if phase not in self.phases:
+            self.phases[phase] = 0.0
+            if phase not in self.phase_names:
+                self.phase_names.append(phase)
+        self.phases[phase] += elapsed_ms
+
+    def mark(self, phase):
+        """Books the time since the last mark, less nested work, to phase."""
+        now = time.perf_counter()
+        self._add(phase, (now - self.last_mark) * 1000 - self.nested_ms)
+        self.nested_ms = 0.0
+        self.last_mark = now
+
+    def timed(self, phase, function):
+        """Wraps function so the time spent in it is booked to phase."""
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._add(phase, elapsed_ms)
+                self.nested_ms += elapsed_ms
+
+        return wrapper
+
+    def end_frame(self):
+        """Records the frame; returns its total time in milliseconds."""
+        total_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frames.append((total_ms, self.phases))
+        self.frame_count += 1
+        if total_ms >= self.slow_frame_ms:
+            self.slow_frames += 1
+            if self.log is not None:
+                breakdown = ", ".join(
+                    f"{phase} {ms:.1f}" for phase, ms in self.phases.items() if ms >= 0.1
+                )
+                self.log(f"Slow frame: {total_ms:.1f} ms ({breakdown})")
+        return total_ms
+
+    def percentiles(self, phase=None, points=(50, 95, 99)):
+        """Returns the given percentiles in ms of a phase, or of whole frames.
+
+        Only frames in which the phase ran count. Returns None without data.
+        """
+        if phase is None:
+            values = [total for total, _ in self.frames]
+        else:
+            values = [phases[phase] for _, phases in self.frames if phase in phases]
+        if not values:
+            return None
+        values.sort()
+        # Nearest-rank percentiles
+        return tuple(
+            values[min(len(values) - 1, max(0, -(-point * len(values) // 100) - 1))]
+            for point in points
+        )
+
+    def sparkline(self, count):
+        """Returns the totals of the last count frames, oldest first."""
+        start = max(0, len(self.frames) - count)
+        return [self.frames[i][0] for i in range(start, len(self.frames))]
+
+    def dump(self, path):
+        """Writes the frames in the ring buffer to path as CSV; returns the row count."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            names = self.phase_names
+            writer.writerow(["frame", "total_ms"] + [f"{phase}_ms" for phase in names])
+            first = self.frame_count - len(self.frames)
+            for i, (total_ms, phases) in enumerate(self.frames):
+                cells = [f"{phases[phase]:.3f}" if phase in phases else "" for phase in names]
+                writer.writerow([first + i, f"{total_ms:.3f}"] + cells)
+        return len(self.frames)
+
+    def summary(self):
+        """Returns report lines: frame and per-phase p50/p95/p99."""
+        lines = []
+        for phase in [None] + self.phase_names:
+            result = self.percentiles(phase)
+            if result is not None:
+                p50, p95, p99 = result
+                lines.append(
+                    f"{phase or 'frame'}: p50 {p50:.2f} p95 {p95:.2f} p99 {p99:.2f} ms"
+                )
+        return lines
@@ -0,0 +1,664 @@
+import copy
+import heapq
+import itertools
+import queue
+import sys
+import time
+
+import bignum
+import costcurve
+import numformat
+import savefile
+import savejournal
+import savestore
+
+# Simulation timing: income is credited in fixed steps, independent of FPS
+SIM_TICK_MS = 100  # 10 simulation ticks per second
+MAX_SIM_STEPS_PER_FRAME = 50  # Catch-up batch size after a stall
+
+# Journal timing: clicked coins are journaled at most this often, and a
+# snapshot compacts the journal once a segment has this many records
+JOURNAL_FLUSH_MS = 250
+JOURNAL_COMPACT_RECORDS = 2000
+
+# Upgrade prices grow by these factors per purchase, rounded down with int()
+UPGRADE_COST_GROWTH = 1.5
+MEGA_UPGRADE_COST_GROWTH = 1  # The mega upgrade always costs the same
+
+# Price of every upgrade level; the UI, the shop and simulations all read these
+UPGRADE_CURVE = costcurve.GeometricCurve(10, UPGRADE_COST_GROWTH)
+MEGA_UPGRADE_CURVE = costcurve.GeometricCurve(200, MEGA_UPGRADE_COST_GROWTH)
+
+# Bulk purchase quantities; BUY_MAX buys as many as the coins allow
+BUY_MAX = "max"
+BULK_QUANTITIES = (1, 10, 100, BUY_MAX)
+
+# Seconds of income the simulation purchase policy saves before buying
+POLICY_SAVINGS_S = 60
+
+# Shop items
+SHOP_ITEMS = {
+    "CPS Booster": {
+        "name": "CPS Booster",
+        "cost": 100,
+        "effect": {"cps_increase": 10, "duration": 10},  # seconds
+    }
+}
+
+
+def monotonic_ms():
+    """Default game clock: milliseconds from a monotonic timer."""
+    return int(time.monotonic() * 1000)
+
+
+def compute_offline_progress(base_cps, effects, offline_ms):
+    """Integrates income over offline_ms without simulating ticks.
+
+    base_cps includes every effect in effects, given as (remaining_ms,
+    cps_increase) pairs. CPS is piecewise constant between expiries, so the
+    income is a sum over those segments. Returns (coin-milliseconds earned,
+    CPS once offline_ms has passed).
+    """
+    earned = 0
+    segment_start = 0
+    current_cps = base_cps
+    for remaining_ms, cps_increase in sorted(effects):
+        if remaining_ms > offline_ms:
+            break
+        segment_end = max(remaining_ms, segment_start)
+        earned += current_cps * (segment_end - segment_start)
+        current_cps -= cps_increase
+        segment_start = segment_end
+    earned += current_cps * (offline_ms - segment_start)
+    return earned, current_cps
+
+
+class Game:
+    """Clicky's economy, effects, inventory and persistence, without any UI.
+
+    Nothing here touches pygame, so a Game can be created and driven from
+    tests or simulations in well under a millisecond. Time comes from clock
+    (milliseconds) and wall_clock (seconds since the epoch). The pygame
+    front end passes pygame.time.get_ticks as clock.
+
+    Persistence is only set up when a store is given; the journal and the
+    background save worker belong to it. A game that journals or saves
+    without calling load() first starts over: its first snapshot replaces
+    whatever the store held. Status messages go to on_message.
+    """
+
+    def __init__(self, store=None, clock=monotonic_ms, wall_clock=time.time):
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.on_message = None
+
+        # Economy
+        # Coins, CPS and the remainder are BigNumbers, so they can grow past 1e308
+        self.coins = bignum.BigNumber(0)
+        self.cps = bignum.BigNumber(0)  # Coins per second
+        self.last_update_time = clock()  # Simulation time income is credited up to
+        # Fractional coins earned so far, in coin-milliseconds
+        self.coin_remainder = bignum.BigNumber(0)
+        self.upgrade_cost = UPGRADE_CURVE.price(0)
+        self.upgrade_amount = 1
+        self.mega_upgrade_cost = MEGA_UPGRADE_CURVE.price(0)
+        self.mega_upgrade_amount = 10  # CPS increase
+
+        # Player inventory
+        self.inventory = {key: 0 for key in SHOP_ITEMS}
+
+        # Active effects, kept as a min-heap of (expires_at, sequence, active) entries
+        self.active_effects = []
+        self.effect_sequence = itertools.count()  # Tie-breaker so heap entries never compare dicts
+
+        # Persistence
+        self.store = store
+        self.autosave = savestore.AutosaveScheduler()
+        self.journal = None
+        self.save_worker = None
+        self.coins_unjournaled = False  # Clicked coins not yet in the journal
+        self.last_journal_time = 0
+        if store is not None:
+            self.journal = savejournal.SaveJournal(store.journal_path)
+            self.save_worker = savestore.SaveWorker()
+
+    def notify(self, text):
+        if self.on_message is not None:
+            self.on_message(text)
+
+    # Actions
+
+    def collect(self, clicks=1):
+        """Adds a coin for each click on the collect button."""
+        self.coins += clicks
+        self.mark_dirty()
+        self.coins_unjournaled = True  # Journaled in batches by update()
+
+    def upgrade_quote(self, quantity=1):
+        """Returns (levels, total cost) of buying quantity normal upgrades.
+
+        quantity may be BUY_MAX, which quotes as many as the coins allow.
+        """
+        curve, level = UPGRADE_CURVE.locate(self.upgrade_cost)
+        if quantity == BUY_MAX:
+            quantity = max(1, curve.max_affordable(level, self.coins))
+        return quantity, curve.total(level, quantity)
+
+    def mega_upgrade_quote(self, quantity=1):
+        """Returns (levels, total cost) of buying quantity mega upgrades."""
+        curve, level = MEGA_UPGRADE_CURVE.locate(self.mega_upgrade_cost)
+        if quantity == BUY_MAX:
+            quantity = max(1, curve.max_affordable(level, self.coins))
+        return quantity, curve.total(level, quantity)
+
+    def buy_upgrade(self, quantity=1):
+        """Buys quantity upgrade levels at once; returns whether it was affordable."""
+        levels, cost = self.upgrade_quote(quantity)
+        if self.coins < cost:
+            self.notify("Not enough coins!")
+            return False
+        self.coins -= cost
+        self.mark_dirty()
+        self.cps += self.upgrade_amount * levels
+        # The cost for the next upgrade grows with every level bought
+        curve, level = UPGRADE_CURVE.locate(self.upgrade_cost)
+        self.upgrade_cost = curve.price(level + levels)
+        self.journal_event("purchase", cps=self.cps, upgrade_cost=self.upgrade_cost)
+        self.notify(
+            "Upgrade Purchased!"
+            if levels == 1
+            else f"{numformat.format_number(levels)} Upgrades Purchased!"
+        )
+        return True
+
+    def buy_mega_upgrade(self, quantity=1):
+        """Buys quantity mega upgrades at once; returns whether it was affordable."""
+        levels, cost = self.mega_upgrade_quote(quantity)
+        if self.coins < cost:
+            self.notify("Not enough coins!")
+            return False
+        self.coins -= cost
+        self.mark_dirty()
+        self.cps += self.mega_upgrade_amount * levels
+        curve, level = MEGA_UPGRADE_CURVE.locate(self.mega_upgrade_cost)
+        self.mega_upgrade_cost = curve.price(level + levels)
+        self.journal_event("purchase", cps=self.cps, mega_upgrade_cost=self.mega_upgrade_cost)
+        self.notify(
+            "Mega Upgrade Purchased!"
+            if levels == 1
+            else f"{numformat.format_number(levels)} Mega Upgrades Purchased!"
+        )
+        return True
+
+    def buy_item(self, item_key):
+        """Buys a shop item into the inventory; returns whether it was affordable."""
+        item = SHOP_ITEMS[item_key]
+        if self.coins < item["cost"]:
+            self.notify("Not enough coins!")
+            return False
+        self.coins -= item["cost"]
+        self.inventory[item_key] += 1
+        self.mark_dirty()
+        self.journal_event("purchase", inventory={item_key: self.inventory[item_key]})
+        self.notify(f"Purchased {item['name']}!")
+        return True
+
+    def use_item(self, item_key):
+        """Uses one of an inventory item; returns whether there was one."""
+        if self.inventory.get(item_key, 0) <= 0:
+            return False
+        self.inventory[item_key] -= 1
+        self.mark_dirty()
+        self.journal_event("use_item", inventory={item_key: self.inventory[item_key]})
+        self.apply_effect(SHOP_ITEMS[item_key]["effect"])
+        return True
+
+    # Effects and simulation
+
+    def apply_effect(self, effect):
+        """Applies an effect to the game (e.g., CPS increase)."""
+        self.cps += effect.get("cps_increase", 0)
+        self.mark_dirty()
+        duration = effect.get("duration", 0)
+        if duration > 0:
+            expiration_time = self.last_update_time + duration * 1000
+            heapq.heappush(
+                self.active_effects,
+                (
+                    expiration_time,
+                    next(self.effect_sequence),
+                    {"effect": effect, "expires_at": expiration_time},
+                ),
+            )
+            self.journal_event(
+                "effect_start", cps=self.cps, effect=effect, expires_at=expiration_time
+            )
+            self.notify(
+                f"Effect Applied: +{effect.get('cps_increase', 0)} CPS for {duration}s"
+            )
+        else:
+            self.journal_event("effect_start", cps=self.cps)
+            self.notify(f"Permanent Effect: +{effect.get('cps_increase', 0)} CPS")
+
+    def update_effects(self, current_time=None):
+        """Updates active effects, removing expired ones.
+
+        Only the heap top is checked, so a frame where nothing expires is O(1)
+        and each expiry costs one O(log n) pop.
+        """
+        if current_time is None:
+            current_time = self.clock()
+        active_effects = self.active_effects
+        while active_effects and current_time >= active_effects[0][0]:
+            _, _, active = heapq.heappop(active_effects)
+            self.cps -= active["effect"].get("cps_increase", 0)
+            self.notify("Effect Expired!")
+            self.mark_dirty()
+            self.journal_event("effect_end", cps=self.cps, expires_at=active["expires_at"])
+
+    def simulate_tick(self):
+        """Advances the economy by one fixed simulation step of SIM_TICK_MS."""
+        self.last_update_time += SIM_TICK_MS
+        self.update_effects(self.last_update_time)
+        self.coin_remainder += self.cps * SIM_TICK_MS
+        carried, self.coin_remainder = divmod(self.coin_remainder, 1000)
+        self.coins += carried
+
+    def step(self, current_time=None):
+        """Runs the fixed-step simulation up to current_time.
+
+        The time between last_update_time and current_time acts as the
+        accumulator: whole steps are consumed, the fraction carries over to
+        the next frame. After a stall at most MAX_SIM_STEPS_PER_FRAME steps
+        run per frame, and the rest is caught up over the following frames.
+        """
+        if current_time is None:
+            current_time = self.clock()
+        steps = min(
+            (current_time - self.last_update_time) // SIM_TICK_MS, MAX_SIM_STEPS_PER_FRAME
+        )
+        for _ in range(steps):
+            self.simulate_tick()
+        return steps
+
+    def ticks_until(self, time_ms):
+        """Returns how many ticks it takes until the tick at or after time_ms."""
+        return max(1, -(-(time_ms - self.last_update_time) // SIM_TICK_MS))
+
+    def ticks_until_affordable(self, price, limit):
+        """Returns after how many ticks at the current CPS coins reach price.
+
+        Counts from 1, since purchases happen between ticks; gives limit if
+        price is out of reach within limit ticks.
+        """
+        if self.coins >= price:
+            return 1
+        if self.cps <= 0:
+            return limit
+        needed = (price - self.coins) * 1000 - self.coin_remainder
+        per_tick = self.cps * SIM_TICK_MS
+        return max(1, int(min(limit, -(-needed // per_tick))))
+
+    def credit_ticks(self, ticks):
+        """Credits income for ticks in which nothing else happens, in one step."""
+        self.last_update_time += ticks * SIM_TICK_MS
+        self.coin_remainder += self.cps * SIM_TICK_MS * ticks
+        carried, self.coin_remainder = divmod(self.coin_remainder, 1000)
+        self.coins += carried
+
+    def cheapest_upgrade_cost(self):
+        return min(self.upgrade_cost, self.mega_upgrade_cost)
+
+    def advance(self, seconds, policy=None):
+        """Fast-forwards the game by seconds of simulation time.
+
+        The result matches calling simulate_tick() once per tick, but only
+        ticks where something happens are simulated one by one: ticks where
+        an effect expires and, with a policy, ticks after which an upgrade
+        becomes affordable. Income between those ticks is credited in one
+        closed-form step. This is what run_ticks() does, tick by tick.
+        The match is exact while the numbers stay below bignum.EXACT_LIMIT;
+        past it both round, and can differ in the last digits.
+
+        policy(game) is called after any tick where the coins reach
+        purchase_target(game, policy). It returns whether it bought
+        something; once it doesn't, it is not asked again for the rest of
+        this advance.
+        """
+        ticks_left = int(seconds * 1000) // SIM_TICK_MS
+        while ticks_left > 0:
+            ticks = ticks_left
+            if self.active_effects:
+                ticks = min(ticks, self.ticks_until(self.active_effects[0][0]))
+            if policy is not None:
+                ticks = self.ticks_until_affordable(purchase_target(self, policy), ticks)
+            self.credit_ticks(ticks - 1)
+            self.simulate_tick()
+            ticks_left -= ticks
+            if policy is not None and self.coins >= purchase_target(self, policy):
+                if not policy(self):
+                    policy = None
+
+    def update(self, current_time=None):
+        """Per-frame update: simulation, then journaling and autosave.
+
+        Returns the number of simulation steps run.
+        """
+        if current_time is None:
+            current_time = self.clock()
+        steps = self.step(current_time)
+        if self.store is None:
+            return steps
+        # Report saves finished by the background worker
+        self.process_save_results()
+        # Journal clicked coins a few times a second so a crash loses little
+        if (
+            self.coins_unjournaled
+            and current_time - self.last_journal_time >= JOURNAL_FLUSH_MS
+        ):
+            self.journal_event("coins")
+        # Auto-save once changes have settled, skipping it if nothing changed;
+        # a long journal is compacted into a snapshot regardless
+        if self.autosave.save_due(current_time):
+            self.save()
+        elif self.journal.records_in_segment >= JOURNAL_COMPACT_RECORDS:
+            self.save(announce=False)
+        return steps
+
+    # Persistence
+
+    def mark_dirty(self):
+        """Flags the game state as changed since the last save."""
+        self.autosave.mark_dirty(self.clock())
+
+    def journal_event(self, op, **fields):
+        """Appends a change to the journal along with the current coin count."""
+        if self.journal is None:
+            return
+        if self.journal.file is None:
+            self.start_journal(0)  # Never loaded: the journal follows this game
+        fields = {name: bignum.to_json(value) for name, value in fields.items()}
+        self.journal.append(
+            op,
+            t=self.wall_clock(),
+            ticks=self.last_update_time,
+            coins=bignum.to_json(self.coins),
+            coin_remainder=bignum.to_json(self.coin_remainder),
+            **fields,
+        )
+        self.coins_unjournaled = False
+        self.last_journal_time = self.clock()
+
+    def snapshot(self):
+        """Returns the game state as a save dict that shares nothing with the game."""
+        return copy.deepcopy(
+            {
+                "version": savefile.SAVE_VERSION,
+                "coins": self.coins,
+                "cps": self.cps,
+                "upgrade_cost": self.upgrade_cost,
+                "upgrade_amount": self.upgrade_amount,
+                "mega_upgrade_cost": self.mega_upgrade_cost,
+                "mega_upgrade_amount": self.mega_upgrade_amount,
+                "last_update_time": self.last_update_time,
+                "coin_remainder": self.coin_remainder,
+                "inventory": self.inventory,
+                "active_effects": [active for _, _, active in self.active_effects],
+                # Wall-clock save time; effect expiries are relative to last_update_time
+                "saved_at": self.wall_clock(),
+                "journal_seq": self.journal.seq if self.journal is not None else 0,
+            }
+        )
+
+    def restore(self, game_state):
+        """Loads a save dict, adding the progress made since it was saved.
+
+        Returns the coins earned while away.
+        """
+        self.coins = bignum.BigNumber(game_state.get("coins", 0))
+        self.cps = bignum.BigNumber(game_state.get("cps", 0))
+        self.upgrade_cost = bignum.from_json(
+            game_state.get("upgrade_cost", UPGRADE_CURVE.price(0))
+        )
+        self.upgrade_amount = game_state.get("upgrade_amount", 1)
+        self.mega_upgrade_cost = bignum.from_json(
+            game_state.get("mega_upgrade_cost", MEGA_UPGRADE_CURVE.price(0))
+        )
+        self.mega_upgrade_amount = game_state.get("mega_upgrade_amount", 10)
+        # Saved tick counts come from another process, so restart the sim clock
+        self.last_update_time = self.clock()
+        self.coin_remainder = bignum.BigNumber(game_state.get("coin_remainder", 0))
+        # Only shop items can be held; drops from older branches are ignored
+        loaded_inventory = game_state.get("inventory", {})
+        self.inventory = {key: loaded_inventory.get(key, 0) for key in SHOP_ITEMS}
+        # Reconstruct active_effects; the saved CPS already includes them
+        loaded_active_effects = game_state.get("active_effects", [])
+        saved_at = game_state.get("saved_at")
+        saved_ticks = game_state.get("last_update_time", 0)
+        if saved_at is None:
+            # Older saves have no wall-clock time, so effects can't be resumed
+            offline_ms = 0
+            effects = [
+                (0, active["effect"].get("cps_increase", 0))
+                for active in loaded_active_effects
+            ]
+        else:
+            offline_ms = max(0, int((self.wall_clock() - saved_at) * 1000))
+            effects = [
+                (active["expires_at"] - saved_ticks, active["effect"].get("cps_increase", 0))
+                for active in loaded_active_effects
+            ]
+        earned, self.cps = compute_offline_progress(self.cps, effects, offline_ms)
+        self.coin_remainder += earned
+        offline_coins, self.coin_remainder = divmod(self.coin_remainder, 1000)
+        self.coins += offline_coins
+        self.active_effects = []
+        for active, (remaining_ms, _) in zip(loaded_active_effects, effects):
+            if remaining_ms > offline_ms:
+                active["expires_at"] = self.last_update_time + remaining_ms - offline_ms
+                self.active_effects.append(
+                    (active["expires_at"], next(self.effect_sequence), active)
+                )
+        heapq.heapify(self.active_effects)
+        return offline_coins
+
+    def save(self, announce=True):
+        """Snapshots the current game state and hands it to the save worker.
+
+        Each snapshot also compacts the journal: it records the last journal
+        record it includes and the journal moves to a new segment. The older
+        segments are deleted once the snapshot has been written. Without a
+        store there is nowhere to save to, and nothing happens.
+        """
+        if self.store is None:
+            return
+        if self.journal.file is None:
+            self.start_journal(0, announce)
+            return
+        game_state = self.snapshot()
+        journal = self.journal
+        finished_segment = journal.rotate()
+        self.save_worker.submit(
+            self.store,
+            game_state,
+            lambda: journal.remove_segments(finished_segment),
+            announce,
+        )
+        self.autosave.mark_saved()
+        self.coins_unjournaled = False
+
+    def start_journal(self, seq, announce=False):
+        """Opens the journal at seq and writes a snapshot for it to follow.
+
+        Records carry this session's ticks and effect expiries, so they must
+        never be replayed onto a snapshot from another session's clock. The
+        snapshot is written before returning, so a crash can't leave new
+        records following an older one.
+        """
+        self.journal.open(seq)
+        self.save(announce)
+        self.save_worker.flush()
+        self.process_save_results()
+
+    def process_save_results(self):
+        """Reports finished background saves; called from update()."""
+        while True:
+            try:
+                error, announce = self.save_worker.results.get_nowait()
+            except queue.Empty:
+                return
+            if error is None:
+                if announce:
+                    print("Game saved successfully.")
+                    self.notify("Game Saved!")
+            else:
+                print(f"Error saving game: {error}")
+                self.notify("Save Failed!")
+                # The state is still unsaved, so autosave tries again later
+                self.mark_dirty()
+
+    def read_save_state(self):
+        """Reads the latest snapshot and replays the journal written after it.
+
+        Returns (game_state, number of journal records replayed); game_state
+        is None when there is neither a save nor a journal, or no store.
+        """
+        if self.store is None:
+            return None, 0
+        game_state = self.store.read()
+        records = list(self.journal.read_records())
+        if not records:
+            return game_state, 0
+        if game_state is None:
+            # Crashed before the first snapshot; the journal alone has the progress
+            game_state = savefile.migrate({})
+        return game_state, savejournal.replay(game_state, records)
+
+    def load(self):
+        """Loads the game state, migrating older save formats.
+
+        Without a store the game simply keeps its fresh state.
+        """
+        if self.store is None:
+            return
+        try:
+            game_state, replayed = self.read_save_state()
+        except Exception as e:
+            print(f"Error loading game: {e}")
+            self.notify("Load Failed!")
+            self.journal.open(0)
+            return
+        if game_state is None:
+            print("Save file does not exist.")
+            self.notify("No Save Found!")
+            self.journal.open(0)
+            return
+        try:
+            offline_coins = self.restore(game_state)
+        except Exception as e:
+            print(f"Error loading game: {e}")
+            self.notify("Load Failed!")
+            self.journal.open(game_state["journal_seq"])
+            return
+        print("Game loaded successfully.")
+        if offline_coins > 0:
+            self.notify(f"Welcome back! +{numformat.format_number(offline_coins)} coins")
+        else:
+            self.notify("Game Loaded!")
+        if replayed:
+            print(f"Recovered {replayed} journal records.")
+        # restore() moved effect expiries onto this session's clock, so the
+        # snapshot on disk must too, replayed records or not
+        self.start_journal(game_state["journal_seq"])
+
+    def close(self):
+        """Makes sure the final save reaches the disk and closes the journal."""
+        if self.store is None:
+            return
+        self.save_worker.flush()
+        self.process_save_results()
+        self.journal.close()
+
+
+class BulkBuyer:
+    """Purchase policy for advance(): buys the cheaper upgrade in bulk.
+
+    It waits until the coins cover the cheaper upgrade and savings_s seconds
+    of income, then buys as many levels as they allow. Buying whenever one
+    level is affordable means a purchase every tick once income passes the
+    flat mega upgrade price, and advance() would be back to simulating every
+    tick; saving up keeps it to a few purchases a minute of game time.
+    """
+
+    def __init__(self, savings_s=POLICY_SAVINGS_S):
+        self.savings_s = savings_s
+
+    def target(self, game):
+        """Coins to reach before the next purchase."""
+        return max(game.cheapest_upgrade_cost(), game.cps * self.savings_s)
+
+    def __call__(self, game):
+        if game.mega_upgrade_cost < game.upgrade_cost:
+            return game.buy_mega_upgrade(BUY_MAX)
+        return game.buy_upgrade(BUY_MAX)
+
+
+# Default purchase policy for simulations
+buy_cheapest_upgrade = BulkBuyer()
+
+
+def purchase_target(game, policy):
+    """Returns the coins at which advance() and run_ticks() call policy.
+
+    That is policy.target(game) if the policy has one, otherwise the price
+    of the cheapest upgrade.
+    """
+    target = getattr(policy, "target", None)
+    return game.cheapest_upgrade_cost() if target is None else target(game)
+
+
+def run_ticks(game, seconds, policy=None):
+    """Reference for advance(): runs every tick, like the real main loop."""
+    for _ in range(int(seconds * 1000) // SIM_TICK_MS):
+        game.simulate_tick()
+        if policy is not None and game.coins >= purchase_target(game, policy):
+            if not policy(game):
+                policy = None
+
+
+def check_determinism(game, seconds, policy=None):
+    """Runs advance() and run_ticks() on copies of a headless game.
+
+    Returns a dict of field -> (advance result, run_ticks result) for every
+    field that differs; an empty dict means both agree.
+    """
+    fast = copy.deepcopy(game)
+    slow = copy.deepcopy(game)
+    fast.advance(seconds, policy)
+    run_ticks(slow, seconds, policy)
+    mismatches = {}
+    for field in (
+        "coins",
+        "coin_remainder",
+        "cps",
+        "last_update_time",
+        "upgrade_cost",
+        "mega_upgrade_cost",
+        "inventory",
+    ):
+        if getattr(fast, field) != getattr(slow, field):
+            mismatches[field] = (getattr(fast, field), getattr(slow, field))
+    fast_effects = sorted((e[0], e[2]["expires_at"]) for e in fast.active_effects)
+    slow_effects = sorted((e[0], e[2]["expires_at"]) for e in slow.active_effects)
+    if fast_effects != slow_effects:
+        mismatches["active_effects"] = (fast_effects, slow_effects)
+    return mismatches
+
+
+if __name__ == "__main__":
+    # Usage: python gamecore.py [count]  -> times creating headless games
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    start = time.perf_counter()
+    games = [Game() for _ in range(count)]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Created {count} games in {elapsed_ms:.1f} ms ({elapsed_ms / count:.4f} ms each)")
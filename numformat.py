@@ -0,0 +1,136 @@
+import math
+import sys
+from collections import OrderedDict
+
+import bignum
+
+# Short-scale suffixes for each power of 1000; larger numbers go scientific
+SUFFIXES = ("", "K", "M", "B", "T", "Qa", "Qi", "Sx", "Sp", "Oc", "No", "Dc")
+
+# Number styles: "short" uses the suffixes, "engineering" writes 12.3e6
+SHORT = "short"
+ENGINEERING = "engineering"
+
+
+def _log10(value):
+    if isinstance(value, bignum.BigNumber):
+        return value.log10()
+    return math.log10(value)
+
+
+class NumberFormatter:
+    """Formats coins, CPS and costs compactly: 999, 1.23K, 45.6M, 7.89e42.
+
+    Numbers are shown to digits significant digits, rounded down so a
+    label never shows more coins than there are. The work splits in two:
+    finding the visible digits is a little arithmetic, building the string
+    is the expensive part. Strings are cached by their visible digits, so
+    a number that changed without changing what is shown (coins going from
+    1,234,001 to 1,234,002 are both "1.23M") reuses the same string object,
+    and the text cache behind it sees no change either.
+    """
+
+    def __init__(self, style=SHORT, digits=3, max_size=1024):
+        if style not in (SHORT, ENGINEERING):
+            raise ValueError(f"Unknown number style {style!r}")
+        self.style = style
+        self.digits = digits
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def visible(self, value):
+        """Returns (shown digits, power of ten of the last one, negative).
+
+        Two values format to the same string exactly when this is equal.
+        """
+        negative = value < 0
+        if negative:
+            value = -value
+        if value < 1000:
+            # Small numbers are shown whole, without a suffix
+            return int(value), 0, negative
+        log = _log10(value)
+        exponent = math.floor(log) - self.digits + 1
+        if exponent <= 0:
+            return int(value), 0, negative
+        shown = self._scale(value, log, exponent)
+        # log10 can land a hair off near exact powers of ten
+        if shown >= 10**self.digits:
+            exponent += 1
+            shown = self._scale(value, log, exponent)
+        elif shown < 10 ** (self.digits - 1):
+            exponent -= 1
+            shown = min(self._scale(value, log, exponent), 10**self.digits - 1)
+        return shown, exponent, negative
+
+    @staticmethod
+    def _scale(value, log, exponent):
+        """Returns int(value / 10 ** exponent)."""
+        if log < 300:
+            scaled = float(value) / 10.0**exponent
+        else:
+            scaled = 10 ** (log - exponent)  # Too big for a float
+        if value >= bignum.EXACT_LIMIT:
+            # Large values are approximations, often just under a round
+            # number (float(10**23) is 9.999...e22); don't floor those down
+            scaled *= 1 + 1e-12
+        return int(scaled)
+
+    def format(self, value):
+        key = self.visible(value)
+        text = self.cache.get(key)
+        if text is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return text
+        self.misses += 1
+        text = self._build(*key)
+        self.cache[key] = text
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+        return text
+
+    __call__ = format
+
+    def _build(self, shown, exponent, negative):
+        sign = "-" if negative else ""
+        if exponent <= 0:
+            return f"{sign}{shown}"
+        # Power of ten of the leading digit, and the group of three it falls in
+        leading = exponent + self.digits - 1
+        group = leading // 3
+        if self.style == SHORT and group >= len(SUFFIXES):
+            return f"{sign}{_digits(shown, self.digits - 1)}e{leading}"
+        # Digits before the point: 1 to 3 within the group
+        whole = leading - group * 3 + 1
+        text = _digits(shown, self.digits - whole)
+        if self.style == SHORT:
+            return f"{sign}{text}{SUFFIXES[group]}"
+        return f"{sign}{text}e{group * 3}"
+
+
+def _digits(shown, decimals):
+    """Writes the int shown with its last decimals digits after a point."""
+    if decimals <= 0:
+        return str(shown)
+    text = str(shown)
+    return f"{text[:-decimals]}.{text[-decimals:]}"
+
+
+# Shared formatter for labels
+DEFAULT_FORMATTER = NumberFormatter()
+
+
+def format_number(value):
+    """Formats value with the shared formatter."""
+    return DEFAULT_FORMATTER.format(value)
+
+
+if __name__ == "__main__":
+    # Usage: python numformat.py [engineering] -> prints sample numbers
+    formatter = NumberFormatter(*sys.argv[1:2])
+    for value in (7, 999, 1000, 1234, 45678, 999999, 10**6, 4.56e9, 7.89e42, 10**400):
+        print(f"{value!r:>30} {formatter.format(value)}")
+    print(f"{bignum.BigNumber(10**4000)!r:>30} {formatter.format(bignum.BigNumber(10**4000))}")
@@ -0,0 +1,311 @@
+import copy
+import json
+import math
+import struct
+import sys
+
+import bignum
+
+# Save format version written by encode_save.
+#   0: unversioned JSON with a category-nested inventory (deprecated/eternalcode.py)
+#   1: unversioned JSON with a flat inventory (savegame.json)
+#   2: versioned binary format below
+#   3: adds the JRNL section with the last journal record in the snapshot
+#   4: ECON numbers are tagged, so they can be BigNumbers as well as ints
+SAVE_VERSION = 4
+
+# Binary layout: header, then sections of (tag, payload length, payload)
+MAGIC = b"CLKY"
+HEADER = struct.Struct("<4sHH")  # magic, version, section count
+SECTION = struct.Struct("<4sI")  # tag, payload length
+EFFECT_RECORD = struct.Struct("<qqq")  # expires_at, cps_increase, duration
+COUNT = struct.Struct("<I")
+FLOAT = struct.Struct("<d")
+BIG_NUMBER = struct.Struct("<dq")  # mantissa, exponent
+
+# Number tags in the version 4 ECON section
+NUMBER_INT = 0
+NUMBER_BIG = 1
+
+# Integer fields of the ECON section, in order
+ECON_FIELDS = (
+    "coins",
+    "cps",
+    "upgrade_cost",
+    "upgrade_amount",
+    "mega_upgrade_cost",
+    "mega_upgrade_amount",
+    "last_update_time",
+    "coin_remainder",
+)
+
+DEFAULT_STATE = {
+    "version": SAVE_VERSION,
+    "coins": 0,
+    "cps": 0,
+    "upgrade_cost": 10,
+    "upgrade_amount": 1,
+    "mega_upgrade_cost": 200,
+    "mega_upgrade_amount": 10,
+    "last_update_time": 0,
+    "coin_remainder": 0,
+    "saved_at": None,
+    "inventory": {"CPS Booster": 0},
+    "active_effects": [],
+    "journal_seq": 0,
+}
+
+
+class SaveFormatError(Exception):
+    """Raised when save data is corrupt or from a newer version."""
+
+
+def _pack_int(value):
+    """Packs an arbitrary-size int as a length byte plus signed bytes."""
+    data = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+    return bytes((len(data),)) + data
+
+
+def _unpack_int(data, offset):
+    length = data[offset]
+    offset += 1
+    return int.from_bytes(data[offset : offset + length], "little", signed=True), offset + length
+
+
+def _pack_number(value):
+    """Packs an int or BigNumber behind a tag byte saying which it is."""
+    if isinstance(value, int) and value.bit_length() < 2000:
+        return bytes((NUMBER_INT,)) + _pack_int(value)
+    value = bignum.BigNumber(value)
+    return bytes((NUMBER_BIG,)) + BIG_NUMBER.pack(value.mantissa, value.exponent)
+
+
+def _unpack_number(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag == NUMBER_INT:
+        return _unpack_int(data, offset)
+    if tag == NUMBER_BIG:
+        mantissa, exponent = BIG_NUMBER.unpack_from(data, offset)
+        return bignum.BigNumber((mantissa, exponent)), offset + BIG_NUMBER.size
+    raise SaveFormatError(f"Unknown number tag {tag}")
+
+
+def _pack_str(text):
+    data = text.encode("utf-8")
+    return COUNT.pack(len(data)) + data
+
+
+def _unpack_str(data, offset):
+    (length,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    return data[offset : offset + length].decode("utf-8"), offset + length
+
+
+def _encode_econ(state):
+    parts = [_pack_number(state[field]) for field in ECON_FIELDS]
+    saved_at = state["saved_at"]
+    parts.append(FLOAT.pack(math.nan if saved_at is None else saved_at))
+    return b"".join(parts)
+
+
+def _decode_econ(data, state):
+    # Before version 4 every number was a plain packed int
+    unpack = _unpack_int if state["version"] < 4 else _unpack_number
+    offset = 0
+    for field in ECON_FIELDS:
+        state[field], offset = unpack(data, offset)
+    (saved_at,) = FLOAT.unpack_from(data, offset)
+    state["saved_at"] = None if math.isnan(saved_at) else saved_at
+
+
+def _encode_inventory(state):
+    inventory = state["inventory"]
+    parts = [COUNT.pack(len(inventory))]
+    for name, count in inventory.items():
+        parts.append(_pack_str(name))
+        parts.append(_pack_int(count))
+    return b"".join(parts)
+
+
+def _decode_inventory(data, state):
+    (count,) = COUNT.unpack_from(data, 0)
+    offset = COUNT.size
+    inventory = {}
+    for _ in range(count):
+        name, offset = _unpack_str(data, offset)
+        inventory[name], offset = _unpack_int(data, offset)
+    state["inventory"] = inventory
+
+
+def _encode_effects(state):
+    pack = EFFECT_RECORD.pack
+    return b"".join(
+        pack(
+            active["expires_at"],
+            active["effect"].get("cps_increase", 0),
+            active["effect"].get("duration", 0),
+        )
+        for active in state["active_effects"]
+    )
+
+
+def _decode_effects(data, state):
+    # Boosters of the same kind share one effect dict, as they do in game
+    effects = {}
+    active_effects = []
+    append = active_effects.append
+    for expires_at, cps_increase, duration in EFFECT_RECORD.iter_unpack(data):
+        key = (cps_increase, duration)
+        effect = effects.get(key)
+        if effect is None:
+            effect = effects[key] = {"cps_increase": cps_increase, "duration": duration}
+        append({"effect": effect, "expires_at": expires_at})
+    state["active_effects"] = active_effects
+
+
+def _encode_journal(state):
+    return _pack_int(state["journal_seq"])
+
+
+def _decode_journal(data, state):
+    state["journal_seq"], _ = _unpack_int(data, 0)
+
+
+# Section tag -> (encoder, decoder)
+SECTIONS = {
+    b"ECON": (_encode_econ, _decode_econ),
+    b"INVT": (_encode_inventory, _decode_inventory),
+    b"EFCT": (_encode_effects, _decode_effects),
+    b"JRNL": (_encode_journal, _decode_journal),
+}
+
+
+def encode_save(state):
+    """Encodes a game state dict into the current binary save format."""
+    state = migrate(state)
+    parts = [HEADER.pack(MAGIC, SAVE_VERSION, len(SECTIONS))]
+    for tag, (encode, _) in SECTIONS.items():
+        payload = encode(state)
+        parts.append(SECTION.pack(tag, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def _decode_binary(data):
+    try:
+        magic, version, section_count = HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise SaveFormatError(f"Truncated save header: {e}")
+    if version > SAVE_VERSION:
+        raise SaveFormatError(f"Save version {version} is newer than {SAVE_VERSION}")
+    state = copy.deepcopy(DEFAULT_STATE)
+    state["version"] = version
+    offset = HEADER.size
+    try:
+        for _ in range(section_count):
+            tag, length = SECTION.unpack_from(data, offset)
+            offset += SECTION.size
+            payload = data[offset : offset + length]
+            if len(payload) != length:
+                raise SaveFormatError(f"Truncated {tag.decode()} section")
+            offset += length
+            section = SECTIONS.get(tag)
+            if section is not None:  # Skip sections this version doesn't know
+                section[1](payload, state)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SaveFormatError(f"Corrupt save data: {e}")
+    return state
+
+
+def decode_save(data):
+    """Decodes binary or legacy JSON save data into a current-version state."""
+    if data[: len(MAGIC)] == MAGIC:
+        return migrate(_decode_binary(data))
+    try:
+        state = json.loads(data)
+    except ValueError as e:
+        raise SaveFormatError(f"Unrecognized save data: {e}")
+    return migrate(state)
+
+
+def detect_version(state):
+    """Returns the format version of a decoded state dict."""
+    if "version" in state:
+        return state["version"]
+    inventory = state.get("inventory", {})
+    if any(isinstance(value, dict) for value in inventory.values()):
+        return 0
+    return 1
+
+
+def migrate_v0_to_v1(state):
+    """Flattens the category-nested inventory and drops combat fields."""
+    inventory = {}
+    for category in state.get("inventory", {}).values():
+        for name, count in category.items():
+            inventory[name] = inventory.get(name, 0) + count
+    state["inventory"] = inventory
+    for key in (
+        "player_hp",
+        "enemy_hp",
+        "in_combat",
+        "combat_start_time",
+        "last_combat_update",
+    ):
+        state.pop(key, None)
+    return state
+
+
+def migrate_v1_to_v2(state):
+    """Fills in fields that unversioned saves may be missing."""
+    for key, default in DEFAULT_STATE.items():
+        if key not in state:
+            state[key] = copy.deepcopy(default)
+    return state
+
+
+def migrate_v2_to_v3(state):
+    """Marks the snapshot as containing no journal records."""
+    state.setdefault("journal_seq", 0)
+    return state
+
+
+def migrate_v3_to_v4(state):
+    """Nothing to convert: ints are still valid values for every number."""
+    return state
+
+
+# Version -> function upgrading a state from that version to the next
+MIGRATIONS = {
+    0: migrate_v0_to_v1,
+    1: migrate_v1_to_v2,
+    2: migrate_v2_to_v3,
+    3: migrate_v3_to_v4,
+}
+
+
+def migrate(state):
+    """Runs the migration chain until state is at SAVE_VERSION."""
+    version = detect_version(state)
+    if version > SAVE_VERSION:
+        raise SaveFormatError(f"Save version {version} is newer than {SAVE_VERSION}")
+    if version == SAVE_VERSION:
+        return state
+    state = dict(state)
+    while version < SAVE_VERSION:
+        state = MIGRATIONS[version](state)
+        version += 1
+    state["version"] = SAVE_VERSION
+    return state
+
+
+def export_json(state):
+    """Returns a readable JSON dump of a save, for debugging."""
+    return json.dumps(migrate(state), indent=2, default=bignum.to_json)
+
+
+if __name__ == "__main__":
+    # Usage: python savefile.py savegame.dat  -> prints the save as JSON
+    with open(sys.argv[1], "rb") as f:
+        print(export_json(decode_save(f.read())))
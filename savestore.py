@@ -0,0 +1,263 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+import savefile
+import savejournal
+
+# Slot names end up in journal file names, so they are kept to safe characters
+SLOT_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class FileSaveStore:
+    """Keeps a single save in a binary file next to the game."""
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+
+    def write(self, game_state):
+        """Atomically writes game_state, returning the bytes written.
+
+        The data goes to a temp file that is fsynced and then swapped in with
+        os.replace, so a crash mid-write never leaves a half-written save.
+        """
+        data = savefile.encode_save(game_state)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        return len(data)
+
+    def read(self):
+        """Returns the saved state, or None if there is no save yet."""
+        for path in (self.path, self.legacy_path):
+            if path is not None and os.path.exists(path):
+                with open(path, "rb") as f:
+                    return savefile.decode_save(f.read())
+        return None
+
+
+class SqliteSaveStore:
+    """Keeps many save slots in one SQLite database.
+
+    Each slot row holds the encoded save plus a few metadata columns (coins,
+    CPS, last played, version). The metadata is indexed, so list_slots can
+    sort and page through thousands of profiles without decoding any save.
+    The database runs in WAL mode so the slot picker can read while the
+    save worker writes. Connections are per thread, as sqlite3 requires.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS slots (
+            slot TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            coins REAL NOT NULL,
+            cps REAL NOT NULL,
+            last_played REAL NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS slots_last_played ON slots (last_played);
+        CREATE INDEX IF NOT EXISTS slots_coins ON slots (coins);
+        CREATE INDEX IF NOT EXISTS slots_cps ON slots (cps);
+        CREATE INDEX IF NOT EXISTS slots_version ON slots (version);
+    """
+
+    # Columns list_slots may sort by
+    ORDER_COLUMNS = ("slot", "version", "coins", "cps", "last_played")
+
+    def __init__(self, db_path, slot="default"):
+        self.db_path = db_path
+        self.slot = slot
+        self.journal_path = self.slot_journal_path(slot)
+        self.local = threading.local()
+        self.connection().executescript(self.SCHEMA)
+
+    def slot_journal_path(self, slot):
+        """Returns the journal path of slot; raises ValueError for unsafe names."""
+        if not SLOT_NAME.fullmatch(slot):
+            raise ValueError(
+                f"Invalid save slot name {slot!r}: use up to 64 letters, digits, - or _"
+            )
+        return f"{os.path.splitext(self.db_path)[0]}-{slot}.journal"
+
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def write(self, game_state):
+        """Writes game_state into this store's slot, returning the bytes written."""
+        data = savefile.encode_save(game_state)
+        connection = self.connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO slots (slot, version, coins, cps, last_played, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.slot,
+                    savefile.SAVE_VERSION,
+                    float(game_state["coins"]),
+                    float(game_state["cps"]),
+                    game_state.get("saved_at") or time.time(),
+                    data,
+                ),
+            )
+        return len(data)
+
+    def read(self):
+        """Returns the state saved in this store's slot, or None if it is empty."""
+        row = (
+            self.connection()
+            .execute("SELECT data FROM slots WHERE slot = ?", (self.slot,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return savefile.decode_save(bytes(row[0]))
+
+    def list_slots(self, order_by="last_played", descending=True, limit=50, offset=0):
+        """Returns slot metadata dicts without loading the saves themselves."""
+        if order_by not in self.ORDER_COLUMNS:
+            raise ValueError(f"Can't order slots by {order_by!r}")
+        direction = "DESC" if descending else "ASC"
+        rows = self.connection().execute(
+            f"SELECT slot, version, coins, cps, last_played FROM slots"
+            f" ORDER BY {order_by} {direction} LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [
+            {
+                "slot": slot,
+                "version": version,
+                "coins": coins,
+                "cps": cps,
+                "last_played": last_played,
+            }
+            for slot, version, coins, cps, last_played in rows
+        ]
+
+    def delete_slot(self, slot):
+        """Deletes slot's save and its journal segments."""
+        journal = savejournal.SaveJournal(self.slot_journal_path(slot))
+        connection = self.connection()
+        with connection:
+            connection.execute("DELETE FROM slots WHERE slot = ?", (slot,))
+        segments = journal.segments()
+        if segments:
+            journal.remove_segments(segments[-1])
+
+
+class SaveWorker:
+    """Writes save snapshots on a background thread.
+
+    submit() only queues a snapshot. If a save is already waiting, the newer
+    snapshot replaces it, so a burst of saves coalesces into one write.
+    on_written, if given, runs on the worker once the file is on disk.
+    Results are reported back through a queue and drained on the main thread.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = None  # (store, game_state, on_written, announce) to write
+        self.in_flight = False
+        self.results = queue.Queue()
+        # Metrics
+        self.saves_written = 0
+        self.saves_coalesced = 0
+        self.saves_failed = 0
+        self.bytes_written = 0
+        self.last_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+        self.thread = threading.Thread(target=self._run, name="save-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, store, game_state, on_written=None, announce=True):
+        with self.condition:
+            if self.pending is not None:
+                self.saves_coalesced += 1
+                announce = announce or self.pending[3]
+            self.pending = (store, game_state, on_written, announce)
+            self.condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Blocks until every submitted snapshot has been written."""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.pending is None and not self.in_flight, timeout
+            )
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None)
+                store, game_state, on_written, announce = self.pending
+                self.pending = None
+                self.in_flight = True
+            start = time.perf_counter()
+            try:
+                size = store.write(game_state)
+                error = None
+                if on_written is not None:
+                    on_written()
+            except Exception as e:
+                size = 0
+                error = e
+            latency_ms = (time.perf_counter() - start) * 1000
+            with self.condition:
+                if error is None:
+                    self.saves_written += 1
+                    self.bytes_written += size
+                else:
+                    self.saves_failed += 1
+                self.last_latency_ms = latency_ms
+                self.total_latency_ms += latency_ms
+                self.in_flight = False
+                self.condition.notify_all()
+            self.results.put((error, announce))
+
+
+class AutosaveScheduler:
+    """Decides when an autosave is due, based on whether anything changed.
+
+    A save is due once the state has been quiet for debounce_ms after the
+    last change, or max_interval_ms after the first unsaved change while
+    changes keep coming. Passive income is not a change: offline progress
+    recomputes it from the saved CPS and save time.
+    """
+
+    def __init__(self, debounce_ms=5000, max_interval_ms=60000):
+        self.debounce_ms = debounce_ms
+        self.max_interval_ms = max_interval_ms
+        self.first_change_time = None  # None while the saved state is current
+        self.last_change_time = None
+
+    def mark_dirty(self, current_time):
+        if self.first_change_time is None:
+            self.first_change_time = current_time
+        self.last_change_time = current_time
+
+    def mark_saved(self):
+        self.first_change_time = None
+        self.last_change_time = None
+
+    def is_dirty(self):
+        return self.first_change_time is not None
+
+    def save_due(self, current_time):
+        if not self.is_dirty():
+            return False
+        return (
+            current_time - self.last_change_time >= self.debounce_ms
+            or current_time - self.first_change_time >= self.max_interval_ms
+        )
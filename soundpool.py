@@ -0,0 +1,95 @@
+import pygame
+
+
+class SoundPool:
+    """Plays sound effects on channels reserved for each sound category.
+
+    Every category gets its own reserved mixer channels, so a burst of
+    clicks can't take the channels purchase sounds need. Each sound has a
+    maximum number of voices (copies playing at once) and a minimum time
+    between starts. A play that would exceed either is dropped before any
+    mixer call: voices are tracked by the time they finish, so telling
+    whether a sound is saturated is arithmetic rather than a channel query.
+    When all of a category's channels are busy with other sounds, the
+    voice that started first is stolen.
+    """
+
+    def __init__(self, categories, clock=pygame.time.get_ticks):
+        """categories maps each category name to its number of channels."""
+        self.clock = clock
+        total = sum(categories.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        # Channels below this are never picked by Sound.play() on its own
+        pygame.mixer.set_reserved(total)
+        self.channels = {}  # category -> [[channel, sound name, end time]]
+        first = 0
+        for category, count in categories.items():
+            self.channels[category] = [
+                [pygame.mixer.Channel(first + i), None, 0] for i in range(count)
+            ]
+            first += count
+        self.sounds = {}  # name -> sound settings and counters
+        self.played = 0
+        self.dropped = 0
+        self.stolen = 0
+
+    def add(self, name, sound, category, max_voices=1, min_interval_ms=0):
+        """Registers a loaded sound; sound may be None if it failed to load."""
+        if category not in self.channels:
+            raise ValueError(f"Unknown sound category {category!r}")
+        self.sounds[name] = {
+            "sound": sound,
+            "category": category,
+            "max_voices": max_voices,
+            "min_interval_ms": min_interval_ms,
+            "length_ms": int(sound.get_length() * 1000) if sound is not None else 0,
+            "voices": [],  # End times of the copies playing
+            "last_start": None,
+            "played": 0,
+            "dropped": 0,
+        }
+
+    def play(self, name):
+        """Plays a sound unless it is missing, saturated or just started.
+
+        Returns whether it was played.
+        """
+        entry = self.sounds.get(name)
+        if entry is None or entry["sound"] is None:
+            return False
+        now = self.clock()
+        voices = entry["voices"] = [end for end in entry["voices"] if end > now]
+        last_start = entry["last_start"]
+        if len(voices) >= entry["max_voices"] or (
+            last_start is not None and now - last_start < entry["min_interval_ms"]
+        ):
+            entry["dropped"] += 1
+            self.dropped += 1
+            return False
+
+        # A free channel of the category, or else the voice that started first
+        slots = self.channels[entry["category"]]
+        slot = next((slot for slot in slots if slot[2] <= now), None)
+        if slot is None:
+            slot = min(slots, key=lambda slot: slot[2] - self.sounds[slot[1]]["length_ms"])
+            victim = self.sounds[slot[1]]
+            if slot[2] in victim["voices"]:
+                victim["voices"].remove(slot[2])
+            self.stolen += 1
+        end = now + entry["length_ms"]
+        slot[0].play(entry["sound"])  # Stops whatever the channel was playing
+        slot[1], slot[2] = name, end
+        voices.append(end)
+        entry["last_start"] = now
+        entry["played"] += 1
+        self.played += 1
+        return True
+
+    def summary(self):
+        """Returns report lines: totals, then played/dropped per sound."""
+        lines = [f"{self.played} played, {self.dropped} dropped, {self.stolen} stolen"]
+        for name, entry in self.sounds.items():
+            state = "missing" if entry["sound"] is None else f"{entry['played']} played"
+            lines.append(f"{name}: {state}, {entry['dropped']} dropped")
+        return lines
@@ -0,0 +1,34 @@
+import copy
+import pickle
+
+from bignum import EXACT_LIMIT, BigNumber, from_json, to_json
+
+
+def test_exact_below_limit():
+    for a, b in ((0, 0), (7, 3), (10**15, 999), (EXACT_LIMIT // 4 - 1, 1)):
+        assert BigNumber(a) + b == a + b
+        assert BigNumber(a) - b == a - b
+        assert divmod(BigNumber(a), max(b, 1)) == divmod(a, max(b, 1))
+        assert int(BigNumber(a) * 3) == a * 3
+
+
+def test_past_float_range():
+    huge = BigNumber(10**4000)
+    assert huge > 10**3999 and huge < 10**4001
+    assert abs(huge.log10() - 4000) < 1e-9
+    assert (huge * huge).log10() == 2 * huge.log10()
+    assert float(huge) == float("inf")
+
+
+def test_mixed_comparisons_and_hash():
+    assert BigNumber(5) == 5 == 5.0
+    assert hash(BigNumber(5)) == hash(5)
+    assert sorted([BigNumber(3), 1, 2.5]) == [1, 2.5, 3]
+
+
+def test_json_and_pickle_round_trip():
+    for value in (BigNumber(12), BigNumber(10**400), BigNumber(-2.5)):
+        assert from_json(to_json(value)) == value
+        assert pickle.loads(pickle.dumps(value)) == value
+        assert copy.deepcopy(value) is value
+    assert to_json(BigNumber(12)) == 12
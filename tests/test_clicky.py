@@ -0,0 +1,86 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+import bignum  # noqa: E402
+import clicky  # noqa: E402
+import gamecore  # noqa: E402
+
+# Collect, upgrade, mega upgrade, bulk, shop/back, inventory, a shop card, nothing
+POINTS = [
+    (340, 300),
+    (470, 300),
+    (470, 435),
+    (330, 435),
+    (100, 555),
+    (700, 555),
+    (300, 140),
+    (5, 5),
+]
+
+
+@pytest.fixture
+def front_end(monkeypatch):
+    """Lets a test replace clicky's game and screen state, and restores them."""
+    for name in ("game", "current_screen", "buy_quantity_index", "INPUT"):
+        monkeypatch.setattr(clicky, name, getattr(clicky, name))
+    clicky.INPUT = clicky.InputBatcher()
+
+
+def game_state(game):
+    return (
+        game.coins,
+        game.cps,
+        game.upgrade_cost,
+        game.mega_upgrade_cost,
+        dict(game.inventory),
+        clicky.current_screen,
+        clicky.buy_quantity_index,
+    )
+
+
+def test_hit_grid_matches_testing_every_widget():
+    rng = random.Random(1)
+    for grid in clicky.HIT_GRIDS.values():
+        widgets = []
+        for cell in grid.cells:
+            for widget in cell:
+                if widget not in widgets:
+                    widgets.append(widget)
+        for _ in range(5000):
+            pos = (rng.randrange(-10, clicky.WIDTH + 10), rng.randrange(-10, clicky.HEIGHT + 10))
+            expected = [
+                (handler, batch) for rect, handler, batch in widgets if rect.collidepoint(pos)
+            ]
+            assert grid.hit(pos) == expected
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_batched_clicks_match_clicks_one_by_one(front_end, seed):
+    rng = random.Random(seed)
+    # Mostly auto-clicker runs on Collect, mixed with every other button
+    frames = [
+        [rng.choice(POINTS) if rng.random() < 0.3 else POINTS[0] for _ in range(rng.randrange(40))]
+        for _ in range(10)
+    ]
+    results = []
+    for batched in (True, False):
+        clicky.game = gamecore.Game(clock=lambda: 0)
+        clicky.game.coins = bignum.BigNumber(3000)
+        clicky.current_screen = clicky.MAIN_GAME
+        clicky.buy_quantity_index = 0
+        for frame in frames:
+            for pos in frame:
+                if batched:
+                    clicky.INPUT.click(pos)
+                else:
+                    for handler, _ in clicky.HIT_GRIDS[clicky.current_screen].hit(pos):
+                        handler(1)
+            clicky.INPUT.end_frame(len(frame))
+        results.append(game_state(clicky.game))
+    assert results[0] == results[1]
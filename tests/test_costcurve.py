@@ -0,0 +1,104 @@
+import pytest
+
+from costcurve import GeometricCurve, PolynomialCurve, TableCurve
+
+
+def test_polynomial_matches_summed_prices():
+    curve = PolynomialCurve([3, 2, 1])
+    for n in range(40):
+        assert curve.cumulative(n) == sum(curve.price(k) for k in range(n))
+        assert curve.level_of(curve.price(n)) == n
+
+
+def test_polynomial_max_affordable():
+    curve = PolynomialCurve([3, 2, 1])
+    for start in range(5):
+        for coins in range(0, 400, 7):
+            count = curve.max_affordable(start, coins)
+            assert curve.total(start, count) <= coins < curve.total(start, count + 1)
+    assert curve.max_affordable(0, 10**6, limit=5) == 5
+
+
+def test_polynomial_constant_prices_terminate():
+    assert PolynomialCurve([5]).level_of(10) is None
+    assert PolynomialCurve([5]).level_of(5) == 0
+    assert PolynomialCurve([5, 0, 0]).max_affordable(3, 12) == 2
+    assert PolynomialCurve([0]).max_affordable(0, 100) == 0
+    assert PolynomialCurve([0]).max_affordable(0, 100, limit=7) == 7
+
+
+def test_polynomial_flat_then_rising_prices():
+    curve = PolynomialCurve([5, -1, 1])  # 5, 5, 7, 11, 17, ...
+    assert curve.level_of(5) == 0
+    assert curve.level_of(7) == 2
+    assert curve.level_of(11) == 3
+    assert curve.level_of(6) is None
+    assert curve.max_affordable(0, 17) == 3
+
+
+@pytest.mark.parametrize("coefficients", [[10, -1], [10, -3, 1], [0, 0, -1], [50, 3, -20, 1]])
+def test_polynomial_rejects_falling_prices(coefficients):
+    with pytest.raises(ValueError):
+        PolynomialCurve(coefficients)
+
+
+def test_polynomial_accepts_prices_that_only_fall_between_levels():
+    curve = PolynomialCurve([3, -4, 4])  # 3, 3, 11: the minimum is at level 0.5
+    assert curve.level_of(11) == 2
+
+
+def test_geometric_matches_one_at_a_time():
+    curve = GeometricCurve(10, 1.5)
+    price, total = 10, 0
+    for n in range(60):
+        assert curve.price(n) == price
+        assert curve.cumulative(n) == total
+        total += price
+        price = int(price * 1.5)
+
+
+def test_geometric_max_affordable():
+    curve = GeometricCurve(10, 1.5)
+    for start in range(10):
+        for coins in (0, 9, 10, 100, 12345, 10**9):
+            count = curve.max_affordable(start, coins)
+            assert curve.total(start, count) <= coins < curve.total(start, count + 1)
+
+
+def test_table_constant_tail():
+    curve = TableCurve([1, 2, 5])
+    assert [curve.price(n) for n in range(5)] == [1, 2, 5, 5, 5]
+    assert curve.cumulative(5) == 18
+    assert curve.max_affordable(0, 18) == 5
+    assert curve.max_affordable(1, 100) == 2 + (100 - 7) // 5
+
+
+def test_geometric_locate_reuses_resumed_curve():
+    curve = GeometricCurve(10, 1.5)
+    price = 100  # Not on the curve, as in a save from an older price formula
+    for _ in range(20):
+        found, level = curve.locate(price)
+        price = found.price(level + 1)
+    assert len(curve.resumed) == 1
+    assert curve.locate(price) == (curve.resumed[100], 20)
+
+
+def test_max_affordable_stays_affordable_past_exact_limit():
+    import bignum
+
+    curve = GeometricCurve(200, 1)
+    coins = bignum.BigNumber(3.6151e19)
+    for extra in range(200):
+        budget = coins + extra * 2**20
+        count = curve.max_affordable(0, budget)
+        assert count > 0 and curve.total(0, count) <= budget
+
+
+def test_max_affordable_into_constant_tail_with_big_numbers():
+    import bignum
+
+    curve = GeometricCurve(200, 1)
+    for coins in (199, 200, 300, 399, 400, 3000):
+        count = curve.max_affordable(0, bignum.BigNumber(coins))
+        assert count == coins // 200
+        assert curve.total(0, count) <= coins
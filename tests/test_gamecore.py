@@ -0,0 +1,193 @@
+import time
+
+import gamecore
+import savestore
+
+
+def test_storeless_game_persistence_is_a_no_op():
+    game = gamecore.Game(clock=lambda: 0)
+    game.collect(5)
+    game.load()
+    game.save()
+    game.update(1000)
+    game.close()
+    assert game.coins == 5
+    assert game.read_save_state() == (None, 0)
+
+
+def make_game(cps=50, coins=0):
+    game = gamecore.Game(clock=lambda: 0, wall_clock=lambda: 0)
+    game.cps = gamecore.bignum.BigNumber(cps)
+    game.coins = gamecore.bignum.BigNumber(coins)
+    return game
+
+
+def test_advance_matches_run_ticks():
+    for cps in (0, 1, 50, 5000):
+        for seconds in (0.1, 10, 95.55, 300):
+            game = make_game(cps, cps * 3)
+            assert gamecore.check_determinism(game, seconds) == {}
+
+
+def test_advance_matches_run_ticks_with_policy():
+    for cps in (0, 1, 50, 5000):
+        for seconds in (10, 95.55, 300):
+            game = make_game(cps, cps * 3)
+            policy = gamecore.buy_cheapest_upgrade
+            assert gamecore.check_determinism(game, seconds, policy) == {}
+
+
+def test_advance_matches_run_ticks_with_effects():
+    game = make_game(50, 1000)
+    for _ in range(3):
+        game.buy_item("CPS Booster")
+        game.use_item("CPS Booster")
+    assert game.active_effects
+    assert gamecore.check_determinism(game, 60) == {}
+    assert gamecore.check_determinism(game, 60, gamecore.buy_cheapest_upgrade) == {}
+
+
+def test_advance_hours_in_milliseconds():
+    game = make_game()
+    start = time.perf_counter()
+    game.advance(4 * 3600)
+    assert time.perf_counter() - start < 0.05
+
+
+def test_advance_hours_in_milliseconds_with_policy():
+    # Buying in bulk keeps purchases to about one a minute of game time,
+    # rather than one per tick once income passes the mega upgrade price
+    game = make_game()
+    calls = []
+
+    def policy(game):
+        calls.append(game.last_update_time)
+        return gamecore.buy_cheapest_upgrade(game)
+
+    policy.target = gamecore.buy_cheapest_upgrade.target
+    start = time.perf_counter()
+    game.advance(4 * 3600, policy)
+    assert time.perf_counter() - start < 0.5
+    assert len(calls) < 4 * 60 + 10
+    assert game.cps > 10**100
+
+
+class FailingStore(savestore.FileSaveStore):
+    def write(self, game_state):
+        raise OSError("disk full")
+
+
+def test_failed_save_is_retried(tmp_path):
+    now = [0]
+    game = gamecore.Game(store=FailingStore(str(tmp_path / "save.dat")), clock=lambda: now[0])
+    game.load()
+    game.collect()
+    now[0] = 10000
+    game.update(now[0])  # Autosave is due and gets queued
+    assert not game.autosave.is_dirty()
+    game.save_worker.flush()
+    game.process_save_results()
+    assert game.autosave.is_dirty()
+    game.close()
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "save.dat")
+    game = gamecore.Game(store=savestore.FileSaveStore(path), clock=lambda: 0)
+    game.load()
+    game.collect(500)
+    assert game.buy_upgrade(3)
+    assert game.buy_item("CPS Booster")
+    game.save()
+    game.close()
+
+    loaded = gamecore.Game(store=savestore.FileSaveStore(path), clock=lambda: 0)
+    loaded.load()
+    for field in ("coins", "cps", "upgrade_cost", "inventory"):
+        assert getattr(loaded, field) == getattr(game, field)
+    loaded.close()
+
+
+def test_journal_recovers_progress_after_a_crash(tmp_path):
+    path = str(tmp_path / "save.dat")
+    game = gamecore.Game(store=savestore.FileSaveStore(path), clock=lambda: 0)
+    game.load()
+    game.collect(300)
+    game.journal_event("coins")
+    assert game.buy_mega_upgrade()
+    game.journal.close()  # Crash: no snapshot was ever written
+
+    recovered = gamecore.Game(store=savestore.FileSaveStore(path), clock=lambda: 0)
+    recovered.load()
+    assert recovered.coins == 100
+    assert recovered.cps == 10
+    assert recovered.mega_upgrade_cost == game.mega_upgrade_cost
+    recovered.close()
+
+
+def booster_session(path, ticks):
+    """Runs a session whose tick clock starts at ticks, using a CPS Booster."""
+    game = gamecore.Game(
+        store=savestore.FileSaveStore(path), clock=lambda: ticks, wall_clock=lambda: 0
+    )
+    game.load()
+    game.collect(200)
+    assert game.buy_item("CPS Booster")
+    assert game.use_item("CPS Booster")
+    game.save()
+    game.close()
+
+
+def crashed_session(path, ticks, booster_expires):
+    """Loads on another tick clock, buys an upgrade and crashes without saving."""
+    game = gamecore.Game(
+        store=savestore.FileSaveStore(path), clock=lambda: ticks, wall_clock=lambda: 0
+    )
+    game.load()
+    assert game.buy_upgrade()
+    if booster_expires:
+        game.update_effects(ticks + 10_000)
+    game.journal.close()
+
+
+def test_journal_replays_onto_the_clock_it_was_written_with(tmp_path):
+    path = str(tmp_path / "save.dat")
+    booster_session(path, 3_600_000)
+    crashed_session(path, 0, booster_expires=False)
+
+    game = gamecore.Game(
+        store=savestore.FileSaveStore(path), clock=lambda: 0, wall_clock=lambda: 0
+    )
+    game.load()
+    assert game.cps == 11
+    [(expires_at, _, _)] = game.active_effects
+    assert expires_at - game.last_update_time == 10_000
+    game.close()
+
+
+def test_effect_ending_after_a_clock_change_is_replayed(tmp_path):
+    path = str(tmp_path / "save.dat")
+    booster_session(path, 3_600_000)
+    crashed_session(path, 0, booster_expires=True)
+
+    game = gamecore.Game(
+        store=savestore.FileSaveStore(path), clock=lambda: 0, wall_clock=lambda: 0
+    )
+    game.load()
+    assert game.cps == 1
+    assert game.active_effects == []
+    game.close()
+
+
+def test_game_persists_without_loading_first(tmp_path):
+    path = str(tmp_path / "save.dat")
+    game = gamecore.Game(store=savestore.FileSaveStore(path), clock=lambda: 0)
+    game.collect(100)
+    assert game.buy_upgrade()
+    game.journal.close()  # Crash before any save
+
+    recovered = gamecore.Game(store=savestore.FileSaveStore(path), clock=lambda: 0)
+    recovered.load()
+    assert recovered.coins == game.coins
+    assert recovered.cps == 1
+    recovered.close()
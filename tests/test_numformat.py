@@ -0,0 +1,44 @@
+import pytest
+
+import bignum
+from numformat import ENGINEERING, NumberFormatter
+
+
+@pytest.mark.parametrize(
+    "value, text",
+    [
+        (0, "0"),
+        (999, "999"),
+        (1000, "1.00K"),
+        (1234, "1.23K"),
+        (45678, "45.6K"),
+        (999999, "999K"),
+        (10**6, "1.00M"),
+        (4.56e9, "4.56B"),
+        (10**23, "100Sx"),
+        (-1234, "-1.23K"),
+        (bignum.BigNumber(10**4000), "1.00e4000"),
+    ],
+)
+def test_short_style(value, text):
+    assert NumberFormatter().format(value) == text
+
+
+def test_engineering_style():
+    formatter = NumberFormatter(ENGINEERING)
+    assert formatter.format(1234) == "1.23e3"
+    assert formatter.format(45678000) == "45.6e6"
+
+
+def test_unchanged_digits_reuse_the_cached_string():
+    formatter = NumberFormatter()
+    first = formatter.format(1234001)
+    assert formatter.format(1234002) is first
+    assert formatter.hits == 1 and formatter.misses == 1
+
+
+def test_cache_is_bounded():
+    formatter = NumberFormatter(max_size=8)
+    for value in range(1000, 100000, 1000):
+        formatter.format(value)
+    assert len(formatter.cache) == 8
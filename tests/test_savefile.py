@@ -0,0 +1,90 @@
+import copy
+import json
+
+import pytest
+
+import bignum
+import savefile
+
+
+def sample_state():
+    state = copy.deepcopy(savefile.DEFAULT_STATE)
+    state.update(
+        coins=22904,
+        cps=26,
+        upgrade_cost=109,
+        coin_remainder=731,
+        saved_at=1700000000.5,
+        journal_seq=42,
+        inventory={"CPS Booster": 3},
+        active_effects=[
+            {"effect": {"cps_increase": 10, "duration": 10}, "expires_at": 15000},
+        ],
+    )
+    return state
+
+
+def test_round_trip():
+    state = sample_state()
+    assert savefile.decode_save(savefile.encode_save(state)) == state
+
+
+def test_round_trip_big_numbers():
+    state = sample_state()
+    state["coins"] = bignum.BigNumber(10**400)
+    state["cps"] = bignum.BigNumber(2**60 + 1)
+    decoded = savefile.decode_save(savefile.encode_save(state))
+    assert decoded["coins"] == state["coins"]
+    assert decoded["cps"] == state["cps"]
+
+
+def test_v0_json_migrates():
+    v0 = {
+        "coins": 500,
+        "cps": 7,
+        "upgrade_cost": 22,
+        "inventory": {"boosts": {"CPS Booster": 2}, "misc": {"CPS Booster": 1}},
+        "player_hp": 80,
+        "in_combat": True,
+    }
+    state = savefile.decode_save(json.dumps(v0).encode())
+    assert state["version"] == savefile.SAVE_VERSION
+    assert state["inventory"] == {"CPS Booster": 3}
+    assert "player_hp" not in state and "in_combat" not in state
+    assert state["coins"] == 500 and state["mega_upgrade_cost"] == 200
+    assert savefile.decode_save(savefile.encode_save(state)) == state
+
+
+def test_v1_json_migrates():
+    # An unversioned save with a flat inventory, as the game used to write
+    v1 = {
+        "coins": 22904,
+        "cps": 26,
+        "upgrade_cost": 109,
+        "upgrade_amount": 1,
+        "mega_upgrade_cost": 200,
+        "mega_upgrade_amount": 10,
+        "last_update_time": 968285,
+        "inventory": {"CPS Booster": 0},
+        "active_effects": [],
+    }
+    state = savefile.decode_save(json.dumps(v1).encode())
+    assert savefile.detect_version(v1) == 1
+    assert state["version"] == savefile.SAVE_VERSION
+    assert state["journal_seq"] == 0 and state["saved_at"] is None
+    for key, value in v1.items():
+        assert state[key] == value
+    assert savefile.decode_save(savefile.encode_save(state)) == state
+
+
+def test_newer_version_is_rejected():
+    data = bytearray(savefile.encode_save(sample_state()))
+    data[4:6] = (savefile.SAVE_VERSION + 1).to_bytes(2, "little")
+    with pytest.raises(savefile.SaveFormatError):
+        savefile.decode_save(bytes(data))
+
+
+def test_truncated_save_is_rejected():
+    data = savefile.encode_save(sample_state())
+    with pytest.raises(savefile.SaveFormatError):
+        savefile.decode_save(data[:-3])
@@ -0,0 +1,66 @@
+import copy
+
+import savefile
+import savejournal
+
+
+def base_state():
+    state = copy.deepcopy(savefile.DEFAULT_STATE)
+    state["journal_seq"] = 1
+    return state
+
+
+def write_records(path):
+    journal = savejournal.SaveJournal(str(path))
+    journal.open(0)
+    journal.append("coins", t=100.0, ticks=1000, coins=5, coin_remainder=0)
+    journal.append("purchase", t=101.0, ticks=2000, coins=3, cps=1, upgrade_cost=15)
+    finished = journal.rotate()
+    journal.append("purchase", t=102.0, ticks=3000, coins=0, inventory={"CPS Booster": 1})
+    journal.append(
+        "effect_start",
+        t=103.0,
+        ticks=4000,
+        cps=11,
+        effect={"cps_increase": 10, "duration": 10},
+        expires_at=14000,
+    )
+    journal.close()
+    return journal, finished
+
+
+def test_replay_applies_records_after_the_snapshot(tmp_path):
+    journal, _ = write_records(tmp_path / "save.journal")
+    state = base_state()
+    applied = savejournal.replay(state, list(journal.read_records()))
+    assert applied == 3  # Record 1 is already in the snapshot
+    assert state["journal_seq"] == 4
+    assert state["cps"] == 11 and state["upgrade_cost"] == 15
+    assert state["inventory"] == {"CPS Booster": 1}
+    assert state["active_effects"] == [
+        {"effect": {"cps_increase": 10, "duration": 10}, "expires_at": 14000}
+    ]
+    assert (state["saved_at"], state["last_update_time"]) == (103.0, 4000)
+
+
+def test_replay_effect_end(tmp_path):
+    journal, _ = write_records(tmp_path / "save.journal")
+    journal.open(4)
+    journal.append("effect_end", t=120.0, ticks=14000, coins=9, cps=1, expires_at=14000)
+    journal.close()
+    state = base_state()
+    savejournal.replay(state, list(journal.read_records()))
+    assert state["active_effects"] == [] and state["cps"] == 1
+
+
+def test_torn_last_record_is_skipped(tmp_path):
+    journal, _ = write_records(tmp_path / "save.journal")
+    with open(journal.segment_path(journal.segments()[-1]), "a") as f:
+        f.write('{"seq": 5, "op": "co')
+    assert [record["seq"] for record in journal.read_records()] == [1, 2, 3, 4]
+
+
+def test_remove_segments(tmp_path):
+    journal, finished = write_records(tmp_path / "save.journal")
+    journal.remove_segments(finished)
+    assert [record["seq"] for record in journal.read_records()] == [3, 4]
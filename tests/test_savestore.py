@@ -0,0 +1,52 @@
+import pytest
+
+import savefile
+import savestore
+
+STATE = {"coins": 12, "cps": 3, "saved_at": 1000.0}
+
+
+def make_state(**changes):
+    state = savefile.migrate({})
+    state.update(STATE)
+    state.update(changes)
+    return state
+
+
+def test_sqlite_slots_round_trip(tmp_path):
+    db = str(tmp_path / "saves.db")
+    for i, slot in enumerate(("alice", "bob", "carol")):
+        savestore.SqliteSaveStore(db, slot).write(make_state(coins=i, saved_at=1000.0 + i))
+    store = savestore.SqliteSaveStore(db, "bob")
+    assert store.read()["coins"] == 1
+    assert [row["slot"] for row in store.list_slots()] == ["carol", "bob", "alice"]
+    assert [row["slot"] for row in store.list_slots("version", limit=1)]
+
+
+def test_sqlite_version_is_indexed(tmp_path):
+    store = savestore.SqliteSaveStore(str(tmp_path / "saves.db"))
+    plan = store.connection().execute(
+        "EXPLAIN QUERY PLAN SELECT slot FROM slots ORDER BY version"
+    ).fetchall()
+    assert "slots_version" in str(plan)
+
+
+def test_delete_slot_removes_journal(tmp_path):
+    db = str(tmp_path / "saves.db")
+    store = savestore.SqliteSaveStore(db, "alice")
+    store.write(make_state())
+    for segment in (0, 1):
+        with open(f"{store.journal_path}.{segment}", "w") as f:
+            f.write("{}\n")
+    other = savestore.SqliteSaveStore(db, "bob")
+    with open(f"{other.journal_path}.0", "w") as f:
+        f.write("{}\n")
+    store.delete_slot("alice")
+    assert store.read() is None
+    assert sorted(p.name for p in tmp_path.glob("*.journal.*")) == ["saves-bob.journal.0"]
+
+
+@pytest.mark.parametrize("slot", ["", "../evil", "a/b", "a\\b", "x" * 65, "a.b"])
+def test_unsafe_slot_names_are_rejected(tmp_path, slot):
+    with pytest.raises(ValueError):
+        savestore.SqliteSaveStore(str(tmp_path / "saves.db"), slot)